@@ -67,6 +67,10 @@ def main():
         metadata={"version": "1.0", "environment": "development"},
     ) as tracer:
 
+        # Agent memory lives for the whole run; each span below attaches
+        # it so that its mutations are recorded on that span.
+        memory = tracer.memory_tracker(namespace="agent_state")
+
         # Create a trace for this agent run
         with tracer.trace() as trace:
 
@@ -85,7 +89,7 @@ def main():
                 span.set_model(result["model"], temperature=0.7)
                 
                 # Initialize agent memory
-                memory = span.memory_tracker(namespace="agent_state")
+                span.attach_memory(memory)
                 memory["goal"] = "Research transformer architectures"
                 memory["status"] = "planning"
                 memory["plan"] = result["text"]
@@ -106,10 +110,7 @@ def main():
                 )
                 
                 # Update memory with findings
-                memory = span.memory_tracker(
-                    initial_state={"goal": "Research transformer architectures", "status": "planning"},
-                    namespace="agent_state",
-                )
+                span.attach_memory(memory)
                 memory["status"] = "researching"
                 memory["sources"] = [r["url"] for r in search_result["results"]]
                 
@@ -130,13 +131,7 @@ def main():
                 span.set_model(result["model"], temperature=0.3)
                 
                 # Update memory with analysis
-                memory = span.memory_tracker(
-                    initial_state={
-                        "goal": "Research transformer architectures",
-                        "status": "researching",
-                    },
-                    namespace="agent_state",
-                )
+                span.attach_memory(memory)
                 memory["status"] = "analyzing"
                 memory["key_findings"] = result["text"]
                 memory["confidence"] = "high"
@@ -146,16 +141,7 @@ def main():
             # ─── Step 4: Memory Update ───
             print("🧠 Step 4: Updating knowledge base...")
             with trace.span("knowledge_update", operation_type="MEMORY") as span:
-                memory = span.memory_tracker(
-                    initial_state={
-                        "goal": "Research transformer architectures",
-                        "status": "analyzing",
-                        "key_findings": "Attention is all you need...",
-                        "confidence": "high",
-                    },
-                    namespace="agent_state",
-                )
-                
+                span.attach_memory(memory)
                 memory["status"] = "completed"
                 memory["summary"] = "Transformers use self-attention for parallel sequence processing"
                 del memory["confidence"]  # Clean up temporary state
@@ -248,8 +248,13 @@ func (s *DBService) prepareStatements() error {
 		VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
 		ON CONFLICT(span_id) DO UPDATE SET
 			duration_ms = excluded.duration_ms,
+			prompt = COALESCE(excluded.prompt, spans.prompt),
 			completion = COALESCE(excluded.completion, spans.completion),
+			prompt_tokens = excluded.prompt_tokens,
 			completion_tokens = excluded.completion_tokens,
+			model = COALESCE(excluded.model, spans.model),
+			temperature = COALESCE(excluded.temperature, spans.temperature),
+			metadata = COALESCE(excluded.metadata, spans.metadata),
 			status = excluded.status,
 			error_message = excluded.error_message
 	`)
@@ -318,7 +323,10 @@ func (s *DBService) InsertTrace(trace *Trace) error {
 
 // InsertSpan persists a new span within an existing trace.
 // If a span with the same ID already exists, it updates
-// duration, completion, tokens, and status.
+// duration, tokens, and status, and fills in the prompt, completion,
+// model, temperature, and metadata when the new record carries them.
+// The SDK relies on this when a long span sends a provisional record
+// ahead of its memory events and the final record at span close.
 func (s *DBService) InsertSpan(span *Span) error {
 	s.mu.Lock()
 	defer s.mu.Unlock()
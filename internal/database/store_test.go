@@ -129,6 +129,119 @@ func TestInsertSpanAndQueryTimeline(t *testing.T) {
 	}
 }
 
+// TestSpanUpsertFillsLateFields verifies that re-inserting a span
+// completes a provisional record sent before the span closed.
+func TestSpanUpsertFillsLateFields(t *testing.T) {
+	svc, err := NewDBService(":memory:")
+	if err != nil {
+		t.Fatalf("NewDBService failed: %v", err)
+	}
+	defer svc.Close()
+
+	now := time.Now().UnixNano()
+	if err := svc.InsertTrace(&Trace{
+		TraceID: "trace-upsert", AgentName: "upsert-agent",
+		StartTime: now, Status: "running",
+	}); err != nil {
+		t.Fatalf("InsertTrace failed: %v", err)
+	}
+
+	provisional := &Span{
+		SpanID: "span-upsert", TraceID: "trace-upsert",
+		OperationType: "LLM", OperationName: "long-call",
+		StartTime: now, DurationMs: 5, Status: "ok",
+	}
+	if err := svc.InsertSpan(provisional); err != nil {
+		t.Fatalf("InsertSpan(provisional) failed: %v", err)
+	}
+
+	prompt := "Summarize the findings"
+	model := "gpt-4"
+	metadata := `{"tool_calls":[]}`
+	final := &Span{
+		SpanID: "span-upsert", TraceID: "trace-upsert",
+		OperationType: "LLM", OperationName: "long-call",
+		StartTime: now, DurationMs: 900,
+		Prompt: &prompt, PromptTokens: 12,
+		Model: &model, Metadata: &metadata,
+		Status: "ok",
+	}
+	if err := svc.InsertSpan(final); err != nil {
+		t.Fatalf("InsertSpan(final) failed: %v", err)
+	}
+
+	timeline, err := svc.QueryTimeline("trace-upsert")
+	if err != nil {
+		t.Fatalf("QueryTimeline failed: %v", err)
+	}
+	if len(timeline) != 1 {
+		t.Fatalf("expected 1 span, got %d", len(timeline))
+	}
+
+	sp := timeline[0]
+	if sp.DurationMs != 900 {
+		t.Errorf("expected duration_ms=900, got %d", sp.DurationMs)
+	}
+	if sp.Prompt == nil || *sp.Prompt != prompt {
+		t.Errorf("expected prompt=%q, got %v", prompt, sp.Prompt)
+	}
+	if sp.PromptTokens != 12 {
+		t.Errorf("expected prompt_tokens=12, got %d", sp.PromptTokens)
+	}
+	if sp.Model == nil || *sp.Model != model {
+		t.Errorf("expected model=%q, got %v", model, sp.Model)
+	}
+	if sp.Metadata == nil || *sp.Metadata != metadata {
+		t.Errorf("expected metadata=%q, got %v", metadata, sp.Metadata)
+	}
+}
+
+// TestTraceEndKeepsStartFields verifies that the SDK's compact trace end
+// record (ID, end time and status only) leaves the start record's agent
+// name, start time and metadata in place.
+func TestTraceEndKeepsStartFields(t *testing.T) {
+	svc, err := NewDBService(":memory:")
+	if err != nil {
+		t.Fatalf("NewDBService failed: %v", err)
+	}
+	defer svc.Close()
+
+	now := time.Now().UnixNano()
+	if err := svc.InsertTrace(&Trace{
+		TraceID: "trace-end", AgentName: "end-agent",
+		StartTime: now, Status: "running",
+		Metadata: map[string]string{"env": "test"},
+	}); err != nil {
+		t.Fatalf("InsertTrace(start) failed: %v", err)
+	}
+
+	end := now + int64(time.Second)
+	if err := svc.InsertTrace(&Trace{
+		TraceID: "trace-end", EndTime: &end, Status: "completed",
+	}); err != nil {
+		t.Fatalf("InsertTrace(end) failed: %v", err)
+	}
+
+	traces, err := svc.QueryTraces(TraceFilter{Limit: 10})
+	if err != nil {
+		t.Fatalf("QueryTraces failed: %v", err)
+	}
+	if len(traces) != 1 {
+		t.Fatalf("expected 1 trace, got %d", len(traces))
+	}
+
+	tr := traces[0]
+	if tr.AgentName != "end-agent" || tr.StartTime != now {
+		t.Errorf("start fields overwritten: agent_name=%s start_time=%d", tr.AgentName, tr.StartTime)
+	}
+	if tr.EndTime == nil || *tr.EndTime != end || tr.Status != "completed" {
+		t.Errorf("expected end_time=%d status=completed, got %v %s", end, tr.EndTime, tr.Status)
+	}
+	if tr.Metadata["env"] != "test" {
+		t.Errorf("expected metadata env=test, got %v", tr.Metadata)
+	}
+}
+
 // TestMemoryDiffs verifies the core feature: memory mutation tracking.
 func TestMemoryDiffs(t *testing.T) {
 	svc, err := NewDBService(":memory:")
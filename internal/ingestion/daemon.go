@@ -114,10 +114,70 @@ type WireMessage struct {
 
 // BatchMessage contains multiple items of different types.
 type BatchMessage struct {
-	Traces       []*database.Trace       `json:"traces,omitempty"`
-	Spans        []*database.Span        `json:"spans,omitempty"`
-	MemoryEvents []*database.MemoryEvent `json:"memory_events,omitempty"`
-	ToolCalls    []*database.ToolCall    `json:"tool_calls,omitempty"`
+	Traces             []*database.Trace       `json:"traces,omitempty"`
+	Spans              []*database.Span        `json:"spans,omitempty"`
+	MemoryEvents       []*database.MemoryEvent `json:"memory_events,omitempty"`
+	MemoryEventColumns []*MemoryEventColumns   `json:"memory_event_columns,omitempty"`
+	ToolCalls          []*database.ToolCall    `json:"tool_calls,omitempty"`
+
+	// BaseTime and TraceID carry values the SDK factors out of the
+	// batch's spans: when set, each span's start_time is an offset from
+	// BaseTime and spans without a trace_id belong to TraceID.
+	BaseTime int64  `json:"base_time,omitempty"`
+	TraceID  string `json:"trace_id,omitempty"`
+}
+
+// expandSpans restores the span fields factored out into BaseTime and
+// TraceID, so the spans can be stored as sent.
+func (b *BatchMessage) expandSpans() {
+	if b.BaseTime == 0 && b.TraceID == "" {
+		return
+	}
+	for _, s := range b.Spans {
+		s.StartTime += b.BaseTime
+		if s.TraceID == "" {
+			s.TraceID = b.TraceID
+		}
+	}
+}
+
+// MemoryEventColumns is a column-oriented encoding of the memory events
+// recorded by a single span. The SDK keeps events as parallel arrays
+// while the span is open and ships them without building one object per
+// event. Event IDs are implied: "<span_id>:<first_seq + index>".
+type MemoryEventColumns struct {
+	SpanID     string    `json:"span_id"`
+	FirstSeq   int64     `json:"first_seq"`
+	Timestamps []int64   `json:"timestamps"`
+	Operations []string  `json:"operations"`
+	Keys       []string  `json:"keys"`
+	OldValues  []*string `json:"old_values"`
+	NewValues  []*string `json:"new_values"`
+	Namespaces []string  `json:"namespaces"`
+}
+
+// Events expands the columns into individual memory events.
+func (c *MemoryEventColumns) Events() ([]*database.MemoryEvent, error) {
+	n := len(c.Timestamps)
+	if len(c.Operations) != n || len(c.Keys) != n || len(c.OldValues) != n ||
+		len(c.NewValues) != n || len(c.Namespaces) != n {
+		return nil, fmt.Errorf("memory event columns for span %s have mismatched lengths", c.SpanID)
+	}
+
+	events := make([]*database.MemoryEvent, n)
+	for i := 0; i < n; i++ {
+		events[i] = &database.MemoryEvent{
+			EventID:   fmt.Sprintf("%s:%d", c.SpanID, c.FirstSeq+int64(i)),
+			SpanID:    c.SpanID,
+			Timestamp: c.Timestamps[i],
+			Operation: c.Operations[i],
+			Key:       c.Keys[i],
+			OldValue:  c.OldValues[i],
+			NewValue:  c.NewValues[i],
+			Namespace: c.Namespaces[i],
+		}
+	}
+	return events, nil
 }
 
 // ============================================================
@@ -134,7 +194,6 @@ type DaemonIngester struct {
 	// Channels for buffered ingestion
 	spanChan        chan *database.Span
 	memoryEventChan chan *database.MemoryEvent
-	traceChan       chan *database.Trace
 
 	listener net.Listener
 	mu       sync.RWMutex
@@ -152,7 +211,6 @@ func NewDaemonIngester(config Config, store database.Store) *DaemonIngester {
 		store:           store,
 		spanChan:        make(chan *database.Span, config.BatchSize*2),
 		memoryEventChan: make(chan *database.MemoryEvent, config.BatchSize*2),
-		traceChan:       make(chan *database.Trace, config.BatchSize),
 		done:            make(chan struct{}),
 	}
 }
@@ -216,7 +274,6 @@ func (d *DaemonIngester) Stop() error {
 	// Close channels to signal flush goroutine
 	close(d.spanChan)
 	close(d.memoryEventChan)
-	close(d.traceChan)
 
 	d.wg.Wait()
 	close(d.done)
@@ -328,16 +385,13 @@ func (d *DaemonIngester) processMessage(msgType MessageType, payload []byte) err
 		if err := json.Unmarshal(payload, &trace); err != nil {
 			return fmt.Errorf("unmarshaling trace: %w", err)
 		}
-		select {
-		case d.traceChan <- &trace:
-			atomic.AddInt64(&d.metrics.TracesIngested, 1)
-		default:
-			// Channel full — insert directly to avoid data loss
-			if err := d.store.InsertTrace(&trace); err != nil {
-				return fmt.Errorf("direct trace insert: %w", err)
-			}
-			atomic.AddInt64(&d.metrics.TracesIngested, 1)
+		// Traces are inserted before the ACK rather than queued: spans
+		// reference their trace, and a later BATCH carrying spans is
+		// inserted synchronously, so it must not overtake the trace.
+		if err := d.store.InsertTrace(&trace); err != nil {
+			return fmt.Errorf("trace insert: %w", err)
 		}
+		atomic.AddInt64(&d.metrics.TracesIngested, 1)
 
 	case MsgSpan:
 		var span database.Span
@@ -385,6 +439,8 @@ func (d *DaemonIngester) processMessage(msgType MessageType, payload []byte) err
 
 // processBatch handles a batch message containing mixed types.
 func (d *DaemonIngester) processBatch(batch *BatchMessage) error {
+	batch.expandSpans()
+
 	for _, t := range batch.Traces {
 		if err := d.store.InsertTrace(t); err != nil {
 			return fmt.Errorf("batch trace insert: %w", err)
@@ -399,11 +455,20 @@ func (d *DaemonIngester) processBatch(batch *BatchMessage) error {
 		atomic.AddInt64(&d.metrics.SpansIngested, int64(len(batch.Spans)))
 	}
 
-	if len(batch.MemoryEvents) > 0 {
-		if err := d.store.BatchInsertMemoryEvents(batch.MemoryEvents); err != nil {
+	memoryEvents := batch.MemoryEvents
+	for _, cols := range batch.MemoryEventColumns {
+		events, err := cols.Events()
+		if err != nil {
+			return fmt.Errorf("decoding memory event columns: %w", err)
+		}
+		memoryEvents = append(memoryEvents, events...)
+	}
+
+	if len(memoryEvents) > 0 {
+		if err := d.store.BatchInsertMemoryEvents(memoryEvents); err != nil {
 			return fmt.Errorf("batch memory event insert: %w", err)
 		}
-		atomic.AddInt64(&d.metrics.MemoryEvents, int64(len(batch.MemoryEvents)))
+		atomic.AddInt64(&d.metrics.MemoryEvents, int64(len(memoryEvents)))
 	}
 
 	for _, tc := range batch.ToolCalls {
@@ -454,17 +519,6 @@ func (d *DaemonIngester) flushLoop(ctx context.Context) {
 			flush()
 			return
 
-		case trace, ok := <-d.traceChan:
-			if !ok {
-				flush()
-				return
-			}
-			// Traces are inserted immediately (low volume, high importance)
-			if err := d.store.InsertTrace(trace); err != nil {
-				log.Printf("[ERROR] Inserting trace: %v", err)
-				atomic.AddInt64(&d.metrics.ErrorCount, 1)
-			}
-
 		case span, ok := <-d.spanChan:
 			if !ok {
 				flush()
@@ -0,0 +1,96 @@
+package ingestion
+
+import (
+	"encoding/json"
+	"testing"
+)
+
+// TestMemoryEventColumnsEvents verifies that a columnar memory event
+// block from the SDK expands into individual events with derived IDs.
+func TestMemoryEventColumnsEvents(t *testing.T) {
+	payload := []byte(`{
+		"memory_event_columns": [{
+			"span_id": "span-001",
+			"first_seq": 3,
+			"timestamps": [100, 200],
+			"operations": ["ADD", "UPDATE"],
+			"keys": ["goal", "goal"],
+			"old_values": [null, "research"],
+			"new_values": ["research", "publish"],
+			"namespaces": ["agent", "agent"]
+		}]
+	}`)
+
+	var batch BatchMessage
+	if err := json.Unmarshal(payload, &batch); err != nil {
+		t.Fatalf("Unmarshal failed: %v", err)
+	}
+	if len(batch.MemoryEventColumns) != 1 {
+		t.Fatalf("expected 1 column block, got %d", len(batch.MemoryEventColumns))
+	}
+
+	events, err := batch.MemoryEventColumns[0].Events()
+	if err != nil {
+		t.Fatalf("Events failed: %v", err)
+	}
+	if len(events) != 2 {
+		t.Fatalf("expected 2 events, got %d", len(events))
+	}
+
+	if events[0].EventID != "span-001:3" || events[1].EventID != "span-001:4" {
+		t.Errorf("unexpected event IDs: %s, %s", events[0].EventID, events[1].EventID)
+	}
+	if events[0].OldValue != nil {
+		t.Errorf("expected nil old_value for ADD, got %q", *events[0].OldValue)
+	}
+	if events[1].OldValue == nil || *events[1].OldValue != "research" {
+		t.Errorf("expected old_value=research for UPDATE, got %v", events[1].OldValue)
+	}
+	if events[1].Operation != "UPDATE" || events[1].Timestamp != 200 || events[1].Namespace != "agent" {
+		t.Errorf("unexpected second event: %+v", events[1])
+	}
+}
+
+// TestMemoryEventColumnsMismatchedLengths verifies that malformed
+// column blocks are rejected instead of producing partial events.
+func TestMemoryEventColumnsMismatchedLengths(t *testing.T) {
+	cols := &MemoryEventColumns{
+		SpanID:     "span-001",
+		Timestamps: []int64{1, 2},
+		Operations: []string{"ADD"},
+		Keys:       []string{"a", "b"},
+		OldValues:  []*string{nil, nil},
+		NewValues:  []*string{nil, nil},
+		Namespaces: []string{"default", "default"},
+	}
+
+	if _, err := cols.Events(); err == nil {
+		t.Error("expected error for mismatched column lengths")
+	}
+}
+
+// TestBatchExpandSpans verifies that span start times and trace IDs
+// factored into the batch header are restored on each span.
+func TestBatchExpandSpans(t *testing.T) {
+	payload := []byte(`{
+		"base_time": 1000,
+		"trace_id": "trace-001",
+		"spans": [
+			{"span_id": "span-001", "start_time": 0},
+			{"span_id": "span-002", "start_time": 25, "trace_id": "trace-002"}
+		]
+	}`)
+
+	var batch BatchMessage
+	if err := json.Unmarshal(payload, &batch); err != nil {
+		t.Fatalf("Unmarshal failed: %v", err)
+	}
+	batch.expandSpans()
+
+	if batch.Spans[0].StartTime != 1000 || batch.Spans[0].TraceID != "trace-001" {
+		t.Errorf("unexpected first span: %+v", batch.Spans[0])
+	}
+	if batch.Spans[1].StartTime != 1025 || batch.Spans[1].TraceID != "trace-002" {
+		t.Errorf("unexpected second span: %+v", batch.Spans[1])
+	}
+}
@@ -22,7 +22,7 @@ Memory Tracking:
 from oculo.tracer import OculoTracer
 from oculo.span import Span, SpanContext
 from oculo.memory import MemoryTracker
-from oculo.transport import OculoTransport
+from oculo.transport import AsyncOculoTransport, OculoTransport
 
 __version__ = "0.1.0"
-__all__ = ["OculoTracer", "Span", "SpanContext", "MemoryTracker", "OculoTransport"]
+__all__ = ["OculoTracer", "Span", "SpanContext", "MemoryTracker", "OculoTransport", "AsyncOculoTransport"]
@@ -0,0 +1,57 @@
+"""
+JSON encoding helpers shared by the SDK's hot paths.
+
+Uses orjson when it is installed (``pip install oculo-sdk[fast]``) and
+falls back to the standard library otherwise. Both paths produce
+compact, non-ASCII-escaped JSON, but not always the same text: floats
+may be formatted differently (orjson writes 1e16, the standard library
+1e+16), and non-finite floats become null with orjson but Infinity or
+NaN with the standard library. A process only uses one of the two, so
+the values it serializes stay comparable with each other.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+# json.dumps() builds a new encoder on every call made with non-default
+# options; configure one up front and reuse it.
+_STDLIB_ENCODER = json.JSONEncoder(default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stdlib_dumps(value: Any) -> str:
+    return _STDLIB_ENCODER.encode(value)
+
+
+def _stdlib_dumps_bytes(value: Any) -> bytes:
+    return _stdlib_dumps(value).encode("utf-8")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> str:
+        """Serialize a value to a compact JSON string."""
+        try:
+            return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            # orjson rejects a few types json accepts (e.g. ints wider than 64 bits)
+            return _stdlib_dumps(value)
+
+    def dumps_bytes(value: Any) -> bytes:
+        """Serialize a value to compact UTF-8 encoded JSON."""
+        try:
+            return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS)
+        except TypeError:
+            return _stdlib_dumps_bytes(value)
+
+    loads = orjson.loads
+else:
+    dumps = _stdlib_dumps
+    dumps_bytes = _stdlib_dumps_bytes
+    loads = json.loads
@@ -5,82 +5,212 @@ The MemoryTracker wraps a dictionary and intercepts all mutations,
 computing diffs and generating MemoryEvents that are sent to the
 Oculo daemon for visualization in the Glass Box TUI.
 
-This module provides two approaches:
-1. MemoryTracker: Standalone tracker that sends events directly via transport
-2. SpanContext.memory_tracker(): Tracker that accumulates events within a span
+MemoryTracker serves two use cases, selected by where its events go:
+1. Standalone: events are batched and sent directly via the transport
+2. SpanContext.memory_tracker(): events are recorded on the span (the sink)
 
 The diffing function compares memory state snapshots before and after
 operations to automatically generate ADD/UPDATE/DELETE events.
 """
 
-import json
+import sys
+import math
 import uuid
 import time
-import copy
 import logging
-from typing import Any, Dict, List, Optional
+import weakref
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
-from oculo.transport import OculoTransport, MessageType
+from oculo import _json
+from oculo.transport import OculoTransport
 
 logger = logging.getLogger("oculo")
 
+# Memory event operations, interned so every event shares one string
+# object and comparisons can short-circuit on identity.
+_OP_ADD = sys.intern("ADD")
+_OP_UPDATE = sys.intern("UPDATE")
+_OP_DELETE = sys.intern("DELETE")
+
+# Wall clock for event and span timestamps across the SDK, bound once so
+# building them skips the module attribute lookup
+_clock = time.time_ns
+
+# Receives each memory event as
+# (operation, key, old_value, new_value, namespace, timestamp); the
+# signature matches SpanContext.record_memory_event. A None timestamp
+# means "now".
+MemorySink = Callable[[str, str, Optional[str], Optional[str], str, Optional[int]], Any]
+
+def _serialize_float(value: float) -> str:
+    # Non-finite floats have no JSON literal; the encoder decides how they
+    # are written
+    return float.__repr__(value) if math.isfinite(value) else _json.dumps(value)
+
+
+# Direct serializers for the common scalar types, keyed by exact type.
+# Each produces JSON text (strings are stored as-is), written as the
+# standard library encoder writes it; orjson may format floats differently.
+_FAST_SERIALIZERS: Dict[type, Callable[[Any], str]] = {
+    str: lambda value: value,
+    int: int.__repr__,
+    float: _serialize_float,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+}
+
+# Number of buffered events after which a standalone tracker flushes
+# its pending events to the transport as a single batch.
+_PENDING_FLUSH_THRESHOLD = 64
+
+
+def _send_pending(transport: OculoTransport, pending: List[Dict[str, Any]]) -> None:
+    """Send a tracker's buffered events as one batch and empty the buffer."""
+    if not pending:
+        return
+    transport.send_batch(memory_events=pending[:])
+    pending.clear()
+
 
 class MemoryTracker:
     """
-    Standalone memory tracker that sends mutations directly to the daemon.
+    Dictionary-like memory tracker that generates MemoryEvents on mutation.
     
-    Use this when you want to track memory changes outside of a span context,
-    or when the agent has a global memory store that persists across traces.
+    By default the tracker sends mutations directly to the daemon. Use this
+    when you want to track memory changes outside of a span context, or when
+    the agent has a global memory store that persists across traces. When a
+    sink is given, events are handed to it instead; SpanContext.memory_tracker()
+    uses this to record events on the span.
+    
+    Stored values are treated as immutable: snapshot() shares them with
+    the tracker instead of copying, so mutate values by assigning a new
+    object to the key rather than changing the stored one in place.
+    
+    Without a sink, events are buffered and sent as a single batch message
+    once 64 events accumulate, on clear(), on flush(), or when used as a
+    context manager and the block exits.
     
     Args:
         transport: Active OculoTransport for sending events
         initial_state: Starting state of the agent's memory
         namespace: Memory namespace for grouping related keys
         span_id: Optional span ID to associate events with
+        sink: Optional callable receiving each event instead of the transport
+        take_ownership: Use initial_state as the tracker's storage instead of
+            copying it. The caller hands the dict over and must not use it
+            afterwards.
     
     Example:
         tracker = MemoryTracker(transport, initial_state={"goal": "research"})
         tracker["findings"] = "New discovery about transformers"
         tracker["goal"] = "publish results"  # Generates UPDATE event
         del tracker["old_data"]  # Generates DELETE event
+        tracker.flush()  # Sends buffered events in one batch
     """
 
+    __slots__ = (
+        "_transport",
+        "_sink",
+        "_state",
+        "_shared",
+        "_serialized",
+        "_namespace",
+        "_span_id",
+        "_event_count",
+        "_event_prefix",
+        "_pending",
+        "__weakref__",
+    )
+
     def __init__(
         self,
-        transport: OculoTransport,
+        transport: Optional[OculoTransport] = None,
         initial_state: Optional[Dict[str, Any]] = None,
         namespace: str = "default",
         span_id: Optional[str] = None,
+        sink: Optional[MemorySink] = None,
+        take_ownership: bool = False,
     ):
+        if transport is None and sink is None:
+            raise ValueError("MemoryTracker requires a transport or a sink")
+
         self._transport = transport
-        self._state: Dict[str, Any] = dict(initial_state or {})
-        self._namespace = namespace
+        self._sink = sink
+        if initial_state is None:
+            self._state: Dict[str, Any] = {}
+        elif take_ownership:
+            self._state = initial_state
+        else:
+            self._state = dict(initial_state)
+        # Set once a snapshot shares _state; the next mutation copies it first
+        self._shared = False
+        # Serialized form of each value, filled on write or first comparison
+        self._serialized: Dict[str, str] = {}
+        self._namespace = sys.intern(namespace)
         self._span_id = span_id or "standalone"
         self._event_count = 0
+        # Event IDs are "<prefix>:<seq>"; one random prefix per tracker keeps
+        # them unique without drawing from os.urandom for every event. A sink
+        # assigns its own IDs.
+        self._event_prefix = uuid.uuid4().hex if sink is None else ""
+        self._pending: List[Dict[str, Any]] = []
+        if transport is not None:
+            # Buffered events are sent when the transport stops, or when the
+            # tracker is garbage-collected before that; the finalizer holds
+            # the list, not the tracker
+            transport._add_tracker(self)
+            weakref.finalize(self, _send_pending, transport, self._pending)
+
+    def __enter__(self) -> "MemoryTracker":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.flush()
 
     def __getitem__(self, key: str) -> Any:
         return self._state[key]
 
     def __setitem__(self, key: str, value: Any) -> None:
-        old_value = self._state.get(key)
-        self._state[key] = value
+        self._set(key, value)
 
+    def _set(self, key: str, value: Any, timestamp: Optional[int] = None) -> None:
+        """Store a value and emit the ADD/UPDATE event, if any."""
+        old_value = self._state.get(key)
+        if key in self._state and _is_unchanged(old_value, value):
+            return
         new_str = self._serialize(value)
 
+        self._unshare()
+        self._state[key] = value
+
         if old_value is None:
-            self._emit_event("ADD", key, new_value=new_str)
+            self._serialized[key] = new_str
+            self._emit_event(_OP_ADD, key, new_value=new_str, timestamp=timestamp)
         else:
-            old_str = self._serialize(old_value)
+            old_str = self._serialized.get(key)
+            if old_str is None:
+                old_str = self._serialize(old_value)
+            self._serialized[key] = new_str
             if old_str != new_str:
-                self._emit_event("UPDATE", key, old_value=old_str, new_value=new_str)
+                self._emit_event(
+                    _OP_UPDATE, key, old_value=old_str, new_value=new_str, timestamp=timestamp,
+                )
 
     def __delitem__(self, key: str) -> None:
+        self._delete(key)
+
+    def _delete(self, key: str, timestamp: Optional[int] = None) -> None:
+        """Remove a key and emit its DELETE event."""
         if key not in self._state:
             raise KeyError(key)
 
+        self._unshare()
         old_value = self._state.pop(key)
-        old_str = self._serialize(old_value)
-        self._emit_event("DELETE", key, old_value=old_str)
+        old_str = self._serialized.pop(key, None)
+        if old_str is None:
+            old_str = self._serialize(old_value)
+        self._emit_event(_OP_DELETE, key, old_value=old_str, timestamp=timestamp)
 
     def __contains__(self, key: str) -> bool:
         return key in self._state
@@ -105,59 +235,113 @@ class MemoryTracker:
 
     def update(self, data: Dict[str, Any]) -> None:
         """Update multiple keys, generating events for each change."""
+        timestamp = _clock()
         for key, value in data.items():
-            self[key] = value
+            self._set(key, value, timestamp)
 
     def clear(self) -> None:
         """Clear all keys, generating DELETE events for each."""
+        timestamp = _clock()
         for key in list(self._state.keys()):
-            del self[key]
-
-    def snapshot(self) -> Dict[str, Any]:
-        """Return a deep copy of the current memory state."""
-        return copy.deepcopy(self._state)
+            self._delete(key, timestamp)
+        self.flush()
+
+    def flush(self) -> None:
+        """Send all buffered events to the daemon as one batch message."""
+        _send_pending(self._transport, self._pending)
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """
+        Return a read-only view of the current memory state.
+        
+        The view is O(1) to take and is unaffected by later mutations of
+        the tracker, which copy the top-level dict on their first write.
+        Values are shared with the tracker, not copied.
+        """
+        self._shared = True
+        return MappingProxyType(self._state)
+
+    def deep_snapshot(self) -> Dict[str, Any]:
+        """
+        Return an independent deep copy of the current memory state.
+        
+        The copy is made by a JSON round-trip, so values come back as
+        the JSON types the daemon would see (tuples become lists and
+        unserializable objects become strings).
+        """
+        return _json.loads(_json.dumps(self._state))
 
     def to_dict(self) -> Dict[str, Any]:
         """Return a shallow copy of the current state."""
         return dict(self._state)
 
+    def _unshare(self) -> None:
+        """Copy the state dict if a snapshot still references it."""
+        if self._shared:
+            self._state = dict(self._state)
+            self._shared = False
+
+    def _redirect(
+        self, sink: Optional[MemorySink], span_id: Optional[str],
+    ) -> Tuple[Optional[MemorySink], str]:
+        """
+        Route later events to a different sink and span.
+        
+        Buffered events are flushed first so they keep their original
+        span. Used by SpanContext.attach_memory().
+        
+        Returns:
+            The previous (sink, span_id), for restoring the tracker.
+        """
+        self.flush()
+        previous = (self._sink, self._span_id)
+        self._sink = sink
+        self._span_id = span_id or "standalone"
+        return previous
+
     def _emit_event(
         self,
         operation: str,
         key: str,
         old_value: Optional[str] = None,
         new_value: Optional[str] = None,
+        timestamp: Optional[int] = None,
     ) -> None:
-        """Send a memory event to the daemon via the transport."""
-        event = {
-            "event_id": str(uuid.uuid4()),
-            "span_id": self._span_id,
-            "timestamp": time.time_ns(),
-            "operation": operation,
-            "key": key,
-            "old_value": old_value,
-            "new_value": new_value,
-            "namespace": self._namespace,
-        }
-        self._transport.send(MessageType.MEMORY_EVENT, event)
+        """Hand a memory event to the sink, or buffer it for the transport."""
+        if self._sink is not None:
+            self._sink(operation, key, old_value, new_value, self._namespace, timestamp)
+        else:
+            self._pending.append({
+                "event_id": f"{self._event_prefix}:{self._event_count}",
+                "span_id": self._span_id,
+                "timestamp": _clock() if timestamp is None else timestamp,
+                "operation": operation,
+                "key": key,
+                "old_value": old_value,
+                "new_value": new_value,
+                "namespace": self._namespace,
+            })
+            if len(self._pending) >= _PENDING_FLUSH_THRESHOLD:
+                self.flush()
         self._event_count += 1
 
-        logger.debug(
-            "Memory %s: %s.%s %s",
-            operation, self._namespace, key,
-            f"({old_value[:30]}... → {new_value[:30]}...)" if operation == "UPDATE" and old_value and new_value
-            else f"= {new_value[:50]}..." if new_value
-            else f"(was: {old_value[:50]}...)" if old_value
-            else "",
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Memory %s: %s.%s %s",
+                operation, self._namespace, key,
+                _format_event_debug(operation, old_value, new_value),
+            )
 
     @staticmethod
     def _serialize(value: Any) -> str:
         """Serialize a value to a string for storage."""
+        fast = _FAST_SERIALIZERS.get(type(value))
+        if fast is not None:
+            return fast(value)
         if isinstance(value, str):
             return value
         try:
-            return json.dumps(value, default=str, ensure_ascii=False)
+            return _json.dumps(value)
         except (TypeError, ValueError):
             return str(value)
 
@@ -167,6 +351,7 @@ def compute_memory_diff(
     after: Dict[str, Any],
     namespace: str = "default",
     span_id: Optional[str] = None,
+    seq_start: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     Compute the diff between two memory state snapshots.
@@ -180,9 +365,15 @@ def compute_memory_diff(
         after: Memory state after the operation
         namespace: Memory namespace
         span_id: Span to associate events with
+        seq_start: First sequence number for event IDs of the form
+            "<span_id>:<seq>". The caller must ensure sequence numbers are
+            not reused for the span. If omitted, IDs use a fresh random
+            prefix instead of the span ID.
     
     Returns:
-        List of MemoryEvent dicts ready for transport
+        List of MemoryEvent dicts ready for transport. UPDATE and DELETE
+        events follow the key order of ``before``; ADD events follow, in
+        the key order of ``after``.
     
     Example:
         before = {"goal": "research", "findings": []}
@@ -190,49 +381,67 @@ def compute_memory_diff(
         events = compute_memory_diff(before, after)
         # Returns: [{"operation": "UPDATE", "key": "findings", ...}]
     """
-    events = []
+    events: List[Dict[str, Any]] = []
     sid = span_id or "diff"
-    all_keys = set(list(before.keys()) + list(after.keys()))
+    if seq_start is None:
+        prefix, seq = uuid.uuid4().hex, 0
+    else:
+        prefix, seq = sid, seq_start
+    # One timestamp for the whole diff: all events describe the same transition
+    timestamp = _clock()
+    serialize = MemoryTracker._serialize
+
+    def emit(operation: str, key: str, old_value: Optional[str], new_value: Optional[str]) -> None:
+        events.append({
+            "event_id": f"{prefix}:{seq + len(events)}",
+            "span_id": sid,
+            "timestamp": timestamp,
+            "operation": operation,
+            "key": key,
+            "old_value": old_value,
+            "new_value": new_value,
+            "namespace": namespace,
+        })
 
-    for key in sorted(all_keys):
-        before_val = before.get(key)
+    # Keys whose value is None are treated as absent on either side.
+    for key, before_val in before.items():
+        if before_val is None:
+            continue
         after_val = after.get(key)
+        if after_val is None:
+            emit(_OP_DELETE, key, serialize(before_val), None)
+        elif not _is_unchanged(before_val, after_val):
+            before_str = serialize(before_val)
+            after_str = serialize(after_val)
+            if before_str != after_str:
+                emit(_OP_UPDATE, key, before_str, after_str)
+
+    for key, after_val in after.items():
+        if after_val is not None and before.get(key) is None:
+            emit(_OP_ADD, key, None, serialize(after_val))
 
-        before_str = MemoryTracker._serialize(before_val) if before_val is not None else None
-        after_str = MemoryTracker._serialize(after_val) if after_val is not None else None
+    return events
 
-        if before_val is None and after_val is not None:
-            events.append({
-                "event_id": str(uuid.uuid4()),
-                "span_id": sid,
-                "timestamp": time.time_ns(),
-                "operation": "ADD",
-                "key": key,
-                "old_value": None,
-                "new_value": after_str,
-                "namespace": namespace,
-            })
-        elif before_val is not None and after_val is None:
-            events.append({
-                "event_id": str(uuid.uuid4()),
-                "span_id": sid,
-                "timestamp": time.time_ns(),
-                "operation": "DELETE",
-                "key": key,
-                "old_value": before_str,
-                "new_value": None,
-                "namespace": namespace,
-            })
-        elif before_str != after_str:
-            events.append({
-                "event_id": str(uuid.uuid4()),
-                "span_id": sid,
-                "timestamp": time.time_ns(),
-                "operation": "UPDATE",
-                "key": key,
-                "old_value": before_str,
-                "new_value": after_str,
-                "namespace": namespace,
-            })
 
-    return events
+def _format_event_debug(operation: str, old_value: Optional[str], new_value: Optional[str]) -> str:
+    """Abbreviate an event's values for debug logging."""
+    if operation is _OP_UPDATE and old_value and new_value:
+        return f"({old_value[:30]}... → {new_value[:30]}...)"
+    if new_value:
+        return f"= {new_value[:50]}..."
+    if old_value:
+        return f"(was: {old_value[:50]}...)"
+    return ""
+
+
+# Types whose == agrees with their serialized form, so equal values of the
+# same type can be treated as an unchanged write without serializing.
+# Not float: 0.0 == -0.0, but they serialize differently.
+_SCALAR_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _is_unchanged(old: Any, new: Any) -> bool:
+    """Return True for a no-op write: the same object, or an equal scalar."""
+    if old is new:
+        return True
+    return type(old) is type(new) and type(new) in _SCALAR_TYPES and old == new
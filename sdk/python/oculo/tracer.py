@@ -18,17 +18,22 @@ Usage:
 """
 
 import uuid
-import time
+import random
+import itertools
 import logging
+from contextvars import ContextVar
 from typing import Any, Dict, Optional
-from contextlib import contextmanager
 
-from oculo.transport import OculoTransport, MessageType
-from oculo.span import Span, SpanContext
-from oculo.memory import MemoryTracker
+from oculo.transport import DEFAULT_PORT, DEFAULT_SOCKET_PATH, AsyncOculoTransport, OculoTransport, MessageType
+from oculo.span import DEFAULT_MAX_TEXT_BYTES, Span, SpanContext
+from oculo.memory import _clock, MemoryTracker
 
 logger = logging.getLogger("oculo")
 
+# Innermost open span in the current thread or asyncio task, used as the
+# default parent of new spans in the same trace
+_CURRENT_SPAN: ContextVar[Optional[SpanContext]] = ContextVar("oculo_current_span", default=None)
+
 
 class OculoTracer:
     """
@@ -43,19 +48,38 @@ class OculoTracer:
         port: Oculo daemon TCP port (default: 9876)
         auto_start: Whether to start the transport immediately (default: True)
         metadata: Additional metadata to attach to all traces
+        socket_path: Daemon Unix domain socket, preferred over TCP when it
+            exists; the default "/tmp/oculo.sock" only for a local host on
+            the default port (default: "/tmp/oculo.sock"). None always
+            uses TCP
+        sample_rate: Fraction of traces to record, decided when each trace
+            starts; unsampled traces send nothing (default: 1.0)
+        max_text_bytes: Longest prompt or completion sent, in UTF-8 bytes;
+            longer text is cut and the span's metadata gets
+            "truncated": true. None disables the limit (default: 32KB)
+        transport: Transport to use instead of creating one from host,
+            port and socket_path, e.g. an AsyncOculoTransport
     """
 
     def __init__(
         self,
         agent_name: str,
         host: str = "127.0.0.1",
-        port: int = 9876,
+        port: int = DEFAULT_PORT,
         auto_start: bool = True,
         metadata: Optional[Dict[str, str]] = None,
+        socket_path: Optional[str] = DEFAULT_SOCKET_PATH,
+        sample_rate: float = 1.0,
+        max_text_bytes: Optional[int] = DEFAULT_MAX_TEXT_BYTES,
+        transport: Optional[OculoTransport] = None,
     ):
         self.agent_name = agent_name
         self.metadata = metadata or {}
-        self.transport = OculoTransport(host=host, port=port)
+        self.sample_rate = sample_rate
+        self.max_text_bytes = max_text_bytes
+        if transport is None:
+            transport = OculoTransport(host=host, port=port, socket_path=socket_path)
+        self.transport = transport
 
         if auto_start:
             self.transport.start()
@@ -64,18 +88,24 @@ class OculoTracer:
         """Flush remaining data and close the transport."""
         self.transport.stop()
 
+    async def aclose(self) -> None:
+        """Flush remaining data and close the transport from an event loop."""
+        if isinstance(self.transport, AsyncOculoTransport):
+            await self.transport.aclose()
+        else:
+            self.transport.stop()
+
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
         self.close()
 
-    @contextmanager
     def trace(
         self,
         trace_id: Optional[str] = None,
         metadata: Optional[Dict[str, str]] = None,
-    ):
+    ) -> "_TraceCM":
         """
         Create a new trace context.
         
@@ -87,58 +117,22 @@ class OculoTracer:
             trace_id: Optional explicit trace ID (auto-generated if not provided)
             metadata: Additional metadata for this trace
         
-        Yields:
-            TraceContext for creating spans within this trace.
+        Returns:
+            Context manager yielding a TraceContext for creating spans
+            within this trace.
         
         Example:
             with tracer.trace() as t:
                 with t.span("step_1", operation_type="LLM") as s:
                     ...
         """
-        tid = trace_id or str(uuid.uuid4())
-        start_time = time.time_ns()
-        
-        merged_metadata = {**self.metadata, **(metadata or {})}
-
-        # Send trace start
-        trace_data = {
-            "trace_id": tid,
-            "agent_name": self.agent_name,
-            "start_time": start_time,
-            "status": "running",
-            "metadata": merged_metadata,
-        }
-        self.transport.send(MessageType.TRACE, trace_data)
-
-        ctx = TraceContext(
-            tracer=self,
-            trace_id=tid,
-            metadata=merged_metadata,
-        )
-
-        try:
-            yield ctx
-            status = "completed"
-        except Exception as e:
-            status = "failed"
-            logger.error("Trace %s failed: %s", tid, e)
-            raise
-        finally:
-            # Send trace end
-            end_data = {
-                "trace_id": tid,
-                "agent_name": self.agent_name,
-                "start_time": start_time,
-                "end_time": time.time_ns(),
-                "status": status,
-                "metadata": merged_metadata,
-            }
-            self.transport.send(MessageType.TRACE, end_data)
+        return _TraceCM(self, trace_id, metadata)
 
     def memory_tracker(
         self,
         initial_state: Optional[Dict[str, Any]] = None,
         namespace: str = "default",
+        take_ownership: bool = False,
     ) -> MemoryTracker:
         """
         Create a standalone memory tracker for monitoring dict changes.
@@ -146,6 +140,8 @@ class OculoTracer:
         Args:
             initial_state: Starting state of the agent's memory
             namespace: Memory namespace for grouping related keys
+            take_ownership: Use initial_state directly instead of copying
+                it; the caller must not use the dict afterwards
         
         Returns:
             MemoryTracker that automatically logs mutations.
@@ -154,6 +150,7 @@ class OculoTracer:
             transport=self.transport,
             initial_state=initial_state,
             namespace=namespace,
+            take_ownership=take_ownership,
         )
 
 
@@ -165,20 +162,31 @@ class TraceContext:
     methods for creating child spans with automatic timing.
     """
 
-    def __init__(self, tracer: OculoTracer, trace_id: str, metadata: Dict[str, str]):
+    def __init__(
+        self,
+        tracer: OculoTracer,
+        trace_id: str,
+        metadata: Dict[str, str],
+        sampled: bool = True,
+    ):
         self.tracer = tracer
         self.trace_id = trace_id
         self.metadata = metadata
-        self._span_stack: list = []
+        self.sampled = sampled
+        # Span IDs are a random per-trace prefix plus a counter, so only
+        # one UUID is generated per trace. The prefix is not the trace ID:
+        # callers may pass an explicit trace_id more than once, and span
+        # IDs must stay unique across the whole store.
+        self._span_prefix = uuid.uuid4().hex
+        self._span_seq = itertools.count(1)
 
-    @contextmanager
     def span(
         self,
         operation_name: str,
         operation_type: str = "LLM",
         parent_span_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-    ):
+    ) -> "_SpanCM":
         """
         Create a new span within this trace.
         
@@ -192,8 +200,9 @@ class TraceContext:
             parent_span_id: Optional parent span for nesting
             metadata: Additional metadata JSON
         
-        Yields:
-            SpanContext with methods for setting prompt, completion, etc.
+        Returns:
+            Context manager yielding a SpanContext with methods for
+            setting prompt, completion, etc.
         
         Example:
             with trace.span("gpt4_call", operation_type="LLM") as s:
@@ -201,58 +210,139 @@ class TraceContext:
                 result = call_gpt4(...)
                 s.set_completion(result, prompt_tokens=100, completion_tokens=50)
         """
-        span_id = str(uuid.uuid4())
-        start_time = time.time_ns()
+        return _SpanCM(self, operation_name, operation_type, parent_span_id, metadata)
+
+
+# trace() and span() wrap every agent run and every LLM call, so their
+# context managers are plain classes rather than @contextmanager
+# generators, which set up and tear down a generator frame per use.
 
-        # Auto-detect parent from span stack
-        if parent_span_id is None and self._span_stack:
-            parent_span_id = self._span_stack[-1]
+class _TraceCM:
+    """Context manager returned by OculoTracer.trace()."""
+
+    __slots__ = ("tracer", "trace_id", "metadata", "sampled")
+
+    def __init__(
+        self,
+        tracer: OculoTracer,
+        trace_id: Optional[str],
+        metadata: Optional[Dict[str, str]],
+    ):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.metadata = metadata
+        self.sampled = True
+
+    def __enter__(self) -> TraceContext:
+        tracer = self.tracer
+        tid = self.trace_id or str(uuid.uuid4())
+        self.trace_id = tid
+        self.metadata = {**tracer.metadata, **(self.metadata or {})}
+
+        # Head-based sampling: the whole trace is kept or dropped
+        self.sampled = tracer.sample_rate >= 1.0 or random.random() < tracer.sample_rate
+        ctx = TraceContext(tracer=tracer, trace_id=tid, metadata=self.metadata, sampled=self.sampled)
+        if not self.sampled:
+            return ctx
+
+        # Send trace start
+        trace_data = {
+            "trace_id": tid,
+            "agent_name": tracer.agent_name,
+            "start_time": _clock(),
+            "status": "running",
+            "metadata": self.metadata,
+        }
+        tracer.transport.send(MessageType.TRACE, trace_data)
+
+        return ctx
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            status = "completed"
+        else:
+            status = "failed"
+            if isinstance(exc, Exception):
+                logger.error("Trace %s failed: %s", self.trace_id, exc)
+
+        if not self.sampled:
+            return
+
+        # Send trace end. The daemon's upsert keeps the agent name, start
+        # time and metadata from the start record, so they aren't repeated.
+        end_data = {
+            "trace_id": self.trace_id,
+            "end_time": _clock(),
+            "status": status,
+        }
+        self.tracer.transport.send(MessageType.TRACE, end_data)
+
+
+class _SpanCM:
+    """Context manager returned by TraceContext.span()."""
+
+    __slots__ = (
+        "trace_ctx",
+        "operation_name",
+        "operation_type",
+        "parent_span_id",
+        "metadata",
+        "ctx",
+        "token",
+    )
+
+    def __init__(
+        self,
+        trace_ctx: TraceContext,
+        operation_name: str,
+        operation_type: str,
+        parent_span_id: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+    ):
+        self.trace_ctx = trace_ctx
+        self.operation_name = operation_name
+        self.operation_type = operation_type
+        self.parent_span_id = parent_span_id
+        self.metadata = metadata
+        self.ctx: Optional[SpanContext] = None
+        self.token = None
+
+    def __enter__(self) -> SpanContext:
+        trace_ctx = self.trace_ctx
+        span_id = f"{trace_ctx._span_prefix}-{next(trace_ctx._span_seq):x}"
+        parent_span_id = self.parent_span_id
+
+        # Auto-detect parent from the enclosing span of this trace
+        if parent_span_id is None:
+            current = _CURRENT_SPAN.get()
+            if current is not None and current.trace_id == trace_ctx.trace_id:
+                parent_span_id = current.span_id
 
         ctx = SpanContext(
-            transport=self.tracer.transport,
-            trace_id=self.trace_id,
+            transport=trace_ctx.tracer.transport,
+            trace_id=trace_ctx.trace_id,
             span_id=span_id,
             parent_span_id=parent_span_id,
-            operation_name=operation_name,
-            operation_type=operation_type,
-            start_time=start_time,
-            metadata=metadata,
+            operation_name=self.operation_name,
+            operation_type=self.operation_type,
+            start_time=_clock(),
+            metadata=self.metadata,
+            max_text_bytes=trace_ctx.tracer.max_text_bytes,
+            sampled=trace_ctx.sampled,
         )
+        self.ctx = ctx
 
-        self._span_stack.append(span_id)
+        self.token = _CURRENT_SPAN.set(ctx)
+        return ctx
 
-        try:
-            yield ctx
+    def __exit__(self, exc_type, exc, tb) -> None:
+        ctx = self.ctx
+        if exc_type is None:
             ctx._status = "ok"
-        except Exception as e:
+        elif isinstance(exc, Exception):
             ctx._status = "error"
-            ctx._error_message = str(e)
-            raise
-        finally:
-            self._span_stack.pop()
-            
-            duration_ms = (time.time_ns() - start_time) // 1_000_000
-
-            span_data = {
-                "span_id": span_id,
-                "trace_id": self.trace_id,
-                "parent_span_id": parent_span_id,
-                "operation_type": operation_type,
-                "operation_name": operation_name,
-                "start_time": start_time,
-                "duration_ms": duration_ms,
-                "prompt": ctx._prompt,
-                "completion": ctx._completion,
-                "prompt_tokens": ctx._prompt_tokens,
-                "completion_tokens": ctx._completion_tokens,
-                "model": ctx._model,
-                "temperature": ctx._temperature,
-                "metadata": ctx._metadata_json,
-                "status": ctx._status,
-                "error_message": ctx._error_message,
-            }
-            self.tracer.transport.send(MessageType.SPAN, span_data)
-
-            # Send any accumulated memory events
-            for event in ctx._memory_events:
-                self.tracer.transport.send(MessageType.MEMORY_EVENT, event)
+            ctx._error_message = str(exc)
+
+        _CURRENT_SPAN.reset(self.token)
+
+        ctx._close(ctx._elapsed_ms())
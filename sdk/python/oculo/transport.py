@@ -10,17 +10,37 @@ at regular intervals, ensuring that the agent's execution thread
 is never blocked by I/O operations.
 """
 
-import json
-import queue
+import os
+import asyncio
 import socket
 import struct
 import threading
 import logging
-import time
-from typing import Any, Dict, Optional
+import weakref
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from oculo import _json
 
 logger = logging.getLogger("oculo")
 
+# Unix domain socket the daemon listens on by default outside Windows,
+# alongside TCP on DEFAULT_PORT
+DEFAULT_SOCKET_PATH = "/tmp/oculo.sock"
+DEFAULT_PORT = 9876
+
+# Hosts for which the default Unix domain socket is preferred over TCP
+_LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Send buffer requested for the daemon connection, large enough that a
+# full flush rarely blocks on the kernel
+_SEND_BUFFER_SIZE = 1 << 20
+
+# Upper bounds for a single socket write when flushing. The buffer count
+# stays well under the platform's IOV_MAX for sendmsg().
+_MAX_WRITE_BYTES = 256 * 1024
+_MAX_WRITE_BUFFERS = 512
+
 
 class MessageType:
     """Wire protocol message type identifiers."""
@@ -30,12 +50,139 @@ class MessageType:
     BATCH = 0x04
 
 
+# Wire message header: [1 byte type][4 bytes length (big-endian)]
+_HDR = struct.Struct(">BI")
+
+# BATCH field that carries each single-item message type when _flush
+# merges queued messages into a batch.
+_BATCH_FIELDS = {
+    MessageType.TRACE: "traces",
+    MessageType.SPAN: "spans",
+    MessageType.MEMORY_EVENT: "memory_events",
+}
+
+# Items merged into one BATCH. The daemon stops storing a batch at the
+# first insert that fails, so this bounds what one bad item can take
+# with it. Memory events inside a span's column block count one each.
+_MAX_BATCH_ITEMS = 100
+
+# Largest encoded merged BATCH, well under the daemon's 10MB message
+# limit; a larger one is sent as the messages it was merged from.
+_MAX_BATCH_BYTES = 1 << 20
+
+# A queued message: (message type, payload)
+_Message = Tuple[int, Dict[str, Any]]
+
+
+def _coalesce(messages) -> List[Tuple[int, Dict[str, Any], List[_Message]]]:
+    """
+    Merge queued messages into BATCH messages.
+    
+    Consecutive traces, spans, memory events and queued batches are sent
+    as one BATCH of up to _MAX_BATCH_ITEMS items. Each kind of item keeps
+    its queued order, and the daemon stores a batch's traces before its
+    spans and its spans before their memory events and tool calls, so a
+    span never arrives ahead of its trace, nor an event ahead of its span.
+    
+    A merged batch is not stored atomically: if one of its inserts fails,
+    the daemon drops that insert and everything after it in the batch,
+    which can be up to _MAX_BATCH_ITEMS items from other messages.
+    
+    Returns:
+        (message type, payload, queued messages it carries) triples
+    """
+    result: List[Tuple[int, Dict[str, Any], List[_Message]]] = []
+    group: List[_Message] = []
+    size = 0
+    for msg in messages:
+        msg_type, data = msg
+        if msg_type == MessageType.BATCH:
+            n = _batch_items(data)
+        elif msg_type in _BATCH_FIELDS:
+            n = 1
+        else:
+            n = None
+
+        if group and (n is None or size + n > _MAX_BATCH_ITEMS):
+            result.append(_merge_group(group))
+            group, size = [], 0
+        if n is None:
+            result.append((msg_type, data, [msg]))
+            continue
+        group.append(msg)
+        size += n
+
+    if group:
+        result.append(_merge_group(group))
+    return result
+
+
+def _batch_items(batch: Dict[str, Any]) -> Optional[int]:
+    """Number of items in a queued BATCH, or None if it can't be merged."""
+    if not all(isinstance(items, list) for items in batch.values()):
+        return None
+    count = 0
+    for field, items in batch.items():
+        if field == "memory_event_columns":
+            count += sum(len(block.get("timestamps", ())) for block in items)
+        else:
+            count += len(items)
+    return count
+
+
+def _merge_group(group: List[_Message]) -> Tuple[int, Dict[str, Any], List[_Message]]:
+    """Combine queued messages into one (type, payload, messages) triple."""
+    if len(group) == 1:
+        return group[0][0], group[0][1], group
+
+    batch: Dict[str, Any] = {}
+    for msg_type, data in group:
+        if msg_type == MessageType.BATCH:
+            for field, items in data.items():
+                batch.setdefault(field, []).extend(items)
+        else:
+            batch.setdefault(_BATCH_FIELDS[msg_type], []).append(data)
+    if len(batch.get("spans", ())) > 1:
+        _compact_spans(batch)
+    return MessageType.BATCH, batch, group
+
+
+def _compact_spans(batch: Dict[str, Any]) -> None:
+    """
+    Factor values shared by a batch's spans into the batch header.
+    
+    Span start times become offsets from the batch's "base_time", and a
+    trace ID common to every span moves to the batch's "trace_id"; the
+    daemon restores both before storing the spans. The span dicts are
+    copied first, since they may belong to the caller of send_batch().
+    """
+    try:
+        base_time = min(span["start_time"] for span in batch["spans"])
+    except (KeyError, TypeError):
+        # Not spans built by SpanContext; send them as they are
+        return
+    spans = [dict(span) for span in batch["spans"]]
+    for span in spans:
+        span["start_time"] -= base_time
+    batch["spans"] = spans
+    batch["base_time"] = base_time
+
+    trace_id = spans[0].get("trace_id")
+    if trace_id is not None and all(span.get("trace_id") == trace_id for span in spans):
+        for span in spans:
+            del span["trace_id"]
+        batch["trace_id"] = trace_id
+
+
 class OculoTransport:
     """
     Non-blocking transport to the Oculo daemon.
     
-    Buffers messages in a thread-safe queue and flushes them
-    to the daemon asynchronously via a background thread.
+    Buffers messages in a lock-protected deque and flushes them
+    to the daemon asynchronously via a background thread. The thread
+    flushes flush_interval after the first message is queued, or as
+    soon as max_buffer_size messages are waiting, and sleeps without
+    polling while nothing is queued.
     
     Args:
         host: Daemon TCP host (default: "127.0.0.1")
@@ -43,24 +190,48 @@ class OculoTransport:
         flush_interval: Seconds between automatic flushes (default: 0.5)
         max_buffer_size: Maximum messages to buffer before force-flush (default: 1000)
         connect_timeout: Socket connection timeout in seconds (default: 5.0)
+        socket_path: Unix domain socket used instead of TCP when it
+            exists. The default "/tmp/oculo.sock" belongs to the daemon on
+            the default port, so it is only used for a local host with
+            port 9876; any other path is used whatever host and port are.
+            None always uses TCP
     """
 
     def __init__(
         self,
         host: str = "127.0.0.1",
-        port: int = 9876,
+        port: int = DEFAULT_PORT,
         flush_interval: float = 0.5,
         max_buffer_size: int = 1000,
         connect_timeout: float = 5.0,
+        socket_path: Optional[str] = DEFAULT_SOCKET_PATH,
     ):
         self.host = host
         self.port = port
+        self.socket_path = socket_path
         self.flush_interval = flush_interval
         self.max_buffer_size = max_buffer_size
         self.connect_timeout = connect_timeout
 
-        self._buffer: queue.Queue = queue.Queue(maxsize=max_buffer_size * 2)
+        # Producers append under _buffer_lock; _flush swaps in a fresh deque.
+        # The limit is checked by hand rather than with deque(maxlen=...),
+        # which would silently evict the oldest message instead of counting
+        # the newest as dropped. The lock is reentrant because a garbage
+        # collection inside it can run a MemoryTracker finalizer that sends.
+        self._buffer: deque = deque()
+        self._buffer_lock = threading.RLock()
+        self._buffer_limit = max_buffer_size * 2
+        # _pending is set while messages are queued, so an idle flush thread
+        # blocks instead of polling; _wake cuts the flush interval short.
+        self._pending = threading.Event()
+        self._wake = threading.Event()
         self._socket: Optional[socket.socket] = None
+        # Reused for each flush's ACK bytes; a flush never sends more
+        # frames than the buffer can hold
+        self._ack_buf = bytearray(self._buffer_limit)
+        # Objects with a flush() that buffer messages before send(), i.e.
+        # MemoryTrackers; stopping flushes them first so nothing is left behind
+        self._trackers: "weakref.WeakSet[Any]" = weakref.WeakSet()
         self._lock = threading.Lock()
         self._running = False
         self._flush_thread: Optional[threading.Thread] = None
@@ -89,13 +260,18 @@ class OculoTransport:
 
     def stop(self) -> None:
         """Stop the transport, flushing remaining data."""
+        self._flush_trackers()
         self._running = False
-        
-        # Final flush
-        self._flush()
-        
+        self._pending.set()
+        self._wake.set()
+
+        # The flush thread sends whatever is left before it exits; joining
+        # it first means nothing else touches the socket concurrently.
         if self._flush_thread:
-            self._flush_thread.join(timeout=2.0)
+            self._flush_thread.join()
+            self._flush_thread = None
+        else:
+            self._flush()
 
         self._disconnect()
         logger.info(
@@ -114,13 +290,30 @@ class OculoTransport:
             msg_type: MessageType constant
             data: JSON-serializable dictionary
         """
-        try:
-            self._buffer.put_nowait((msg_type, data))
-        except queue.Full:
-            self.messages_dropped += 1
+        with self._buffer_lock:
+            queued = len(self._buffer)
+            if queued < self._buffer_limit:
+                self._buffer.append((msg_type, data))
+                queued += 1
+                if queued == 1:
+                    self._pending.set()
+            else:
+                queued = -1
+                self.messages_dropped += 1
+
+        if queued < 0:
             logger.warning("Oculo buffer full — dropping message (total dropped: %d)", self.messages_dropped)
+        elif queued >= self.max_buffer_size:
+            self._wake.set()
 
-    def send_batch(self, traces=None, spans=None, memory_events=None, tool_calls=None) -> None:
+    def send_batch(
+        self,
+        traces=None,
+        spans=None,
+        memory_events=None,
+        tool_calls=None,
+        memory_event_columns=None,
+    ) -> None:
         """
         Queue a batch message containing multiple items.
         
@@ -129,6 +322,8 @@ class OculoTransport:
             spans: List of span dicts
             memory_events: List of memory event dicts
             tool_calls: List of tool call dicts
+            memory_event_columns: List of per-span columnar memory event
+                blocks (see SpanContext._memory_event_columns)
         """
         batch = {}
         if traces:
@@ -137,23 +332,30 @@ class OculoTransport:
             batch["spans"] = spans
         if memory_events:
             batch["memory_events"] = memory_events
+        if memory_event_columns:
+            batch["memory_event_columns"] = memory_event_columns
         if tool_calls:
             batch["tool_calls"] = tool_calls
 
         self.send(MessageType.BATCH, batch)
 
+    def _add_tracker(self, tracker: Any) -> None:
+        """Flush tracker when the transport stops, for as long as it lives."""
+        self._trackers.add(tracker)
+
+    def _flush_trackers(self) -> None:
+        for tracker in list(self._trackers):
+            tracker.flush()
+
     def _connect(self) -> bool:
-        """Establish TCP connection to the daemon."""
+        """Establish a connection to the daemon."""
         with self._lock:
             if self._connected:
                 return True
 
             try:
-                self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self._socket.settimeout(self.connect_timeout)
-                self._socket.connect((self.host, self.port))
+                self._socket = self._open_socket()
                 self._connected = True
-                logger.debug("Connected to Oculo daemon at %s:%d", self.host, self.port)
                 return True
             except (socket.error, OSError) as e:
                 logger.warning("Cannot connect to Oculo daemon: %s", e)
@@ -161,6 +363,66 @@ class OculoTransport:
                 self._socket = None
                 return False
 
+    def _open_socket(self) -> socket.socket:
+        """
+        Open and tune a socket connected to the daemon.
+        
+        The daemon is reached over its Unix domain socket when one exists
+        at socket_path and applies to host:port (see _prefers_unix_socket),
+        skipping the TCP/IP stack; otherwise, or if that connect fails,
+        over TCP to host:port.
+        """
+        if self._prefers_unix_socket():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.connect_timeout)
+                sock.connect(self.socket_path)
+                self._tune_socket(sock, tcp=False)
+            except OSError as e:
+                sock.close()
+                logger.debug("Cannot connect to %s, falling back to TCP: %s", self.socket_path, e)
+            else:
+                logger.debug("Connected to Oculo daemon at %s", self.socket_path)
+                return sock
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect((self.host, self.port))
+            self._tune_socket(sock, tcp=True)
+        except OSError:
+            sock.close()
+            raise
+        logger.debug("Connected to Oculo daemon at %s:%d", self.host, self.port)
+        return sock
+
+    def _prefers_unix_socket(self) -> bool:
+        """
+        Whether to try the Unix domain socket before TCP.
+        
+        The default socket is only used in place of the default local
+        address; a caller naming another port expects that daemon, not
+        whichever one owns /tmp/oculo.sock. A non-default socket_path
+        was chosen explicitly and is used as given.
+        """
+        if not (self.socket_path and hasattr(socket, "AF_UNIX") and os.path.exists(self.socket_path)):
+            return False
+        if self.socket_path != DEFAULT_SOCKET_PATH:
+            return True
+        return self.host in _LOCAL_HOSTS and self.port == DEFAULT_PORT
+
+    @staticmethod
+    def _tune_socket(sock: socket.socket, tcp: bool) -> None:
+        """Apply socket options for a freshly connected daemon socket."""
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SEND_BUFFER_SIZE)
+        if not tcp:
+            return
+        # Writes are already batched per flush; don't let Nagle hold them
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if hasattr(socket, "TCP_QUICKACK"):
+            # Linux only: acknowledge the daemon's ACK bytes immediately
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
     def _disconnect(self) -> None:
         """Close the socket connection."""
         with self._lock:
@@ -175,64 +437,419 @@ class OculoTransport:
     def _flush_loop(self) -> None:
         """Background thread that periodically flushes the buffer."""
         while self._running:
-            time.sleep(self.flush_interval)
+            self._pending.wait()
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
             self._flush()
+        # Final flush for anything queued while stopping
+        self._flush()
 
     def _flush(self) -> None:
         """Send all buffered messages to the daemon."""
-        messages = []
-        while not self._buffer.empty():
-            try:
-                messages.append(self._buffer.get_nowait())
-            except queue.Empty:
-                break
-
+        messages = self._take_messages()
         if not messages:
             return
 
         # Ensure we have a connection
         if not self._connected:
             if not self._connect():
-                # Can't connect — re-queue messages (up to limit)
-                for msg in messages[:self.max_buffer_size]:
-                    try:
-                        self._buffer.put_nowait(msg)
-                    except queue.Full:
-                        self.messages_dropped += 1
+                self._requeue(messages)
                 return
 
-        for msg_type, data in messages:
+        frames, count = self._encode_frames(messages)
+        if not frames:
+            return
+
+        try:
+            self._send_frames(frames)
+            self.messages_sent += count
+        except Exception as e:
+            self.errors += 1
+            logger.debug("Failed to send messages: %s", e)
+            # Reconnect on next flush
+            self._disconnect()
+
+    def _take_messages(self) -> deque:
+        """Detach and return everything queued so far."""
+        with self._buffer_lock:
+            messages, self._buffer = self._buffer, deque()
+            self._pending.clear()
+        return messages
+
+    def _requeue(self, messages: deque) -> None:
+        """
+        Put messages that could not be sent back in the buffer.
+        
+        Up to max_buffer_size of them go back ahead of anything queued
+        since, so they still go out in order; the rest are dropped.
+        """
+        retry = list(messages)[:self.max_buffer_size]
+        with self._buffer_lock:
+            total = len(messages) + len(self._buffer)
+            retry.extend(self._buffer)
+            self._buffer = deque(retry[:self._buffer_limit])
+            self.messages_dropped += total - len(self._buffer)
+            # Retry after the next flush interval
+            self._pending.set()
+
+    def _encode_frames(self, messages: deque) -> Tuple[List[Tuple[int, bytes]], int]:
+        """
+        Coalesce and encode queued messages.
+        
+        Returns:
+            (message type, encoded JSON payload) pairs, and the number
+            of queued messages they carry
+        """
+        frames = []
+        count = 0
+        for msg_type, data, group in _coalesce(messages):
             try:
-                self._send_wire_message(msg_type, data)
-                self.messages_sent += 1
-            except Exception as e:
-                self.errors += 1
-                logger.debug("Failed to send message: %s", e)
-                # Reconnect on next flush
-                self._disconnect()
-                break
-
-    def _send_wire_message(self, msg_type: int, data: Dict[str, Any]) -> None:
-        """
-        Send a single wire message over the socket.
+                payload = _json.dumps_bytes(data)
+            except (TypeError, ValueError) as e:
+                payload = None
+                if len(group) == 1:
+                    self.errors += 1
+                    logger.debug("Failed to encode message: %s", e)
+                    continue
+            if payload is not None and (len(group) == 1 or len(payload) <= _MAX_BATCH_BYTES):
+                frames.append((msg_type, payload))
+                count += len(group)
+                continue
+
+            # A merged batch that is too large or won't encode goes out as
+            # the messages it was built from
+            for part_type, part in group:
+                try:
+                    frames.append((part_type, _json.dumps_bytes(part)))
+                    count += 1
+                except (TypeError, ValueError) as e:
+                    self.errors += 1
+                    logger.debug("Failed to encode message: %s", e)
+        return frames, count
+
+    def _send_frames(self, frames: List[Tuple[int, bytes]]) -> None:
+        """
+        Send encoded wire messages in one write and collect their ACKs.
+        
+        The daemon ACKs each message with one byte, so the ACKs are read
+        together after the write instead of one round-trip per message.
         
-        Wire format: [1 byte type][4 bytes length (big-endian)][JSON payload]
+        Args:
+            frames: (message type, encoded JSON payload) pairs
         """
-        payload = json.dumps(data, default=str).encode("utf-8")
-        header = struct.pack(">BI", msg_type, len(payload))
+        buffers = self._pack_frames(frames)
+        view = self._ack_view(len(frames))
 
-        with self._lock:
-            if not self._socket:
-                raise ConnectionError("Not connected to daemon")
+        # No lock: only the flush thread (or stop(), once it has exited)
+        # writes to the socket
+        if not self._socket:
+            raise ConnectionError("Not connected to daemon")
 
-            self._socket.sendall(header + payload)
+        self._write_buffers(buffers)
 
-            # Read ACK (1 byte)
-            ack = self._socket.recv(1)
-            if not ack or ack[0] != 0x00:
-                raise RuntimeError(f"Daemon returned error ACK: {ack}")
+        received = 0
+        while received < len(view):
+            n = self._socket.recv_into(view[received:])
+            if n == 0:
+                raise ConnectionError("Daemon closed the connection")
+            received += n
+
+        if any(view):
+            raise RuntimeError(f"Daemon returned error ACK: {view.tobytes()!r}")
+
+    @staticmethod
+    def _pack_frames(frames: List[Tuple[int, bytes]]) -> List[Any]:
+        """
+        Interleave wire headers with the frames' payloads.
+        
+        Headers for all frames are packed into one buffer and written
+        alongside the JSON payloads, so payloads are never copied to
+        prepend a header.
+        """
+        size = _HDR.size
+        headers = bytearray(size * len(frames))
+        header_view = memoryview(headers)
+        buffers = []
+        offset = 0
+        for msg_type, payload in frames:
+            _HDR.pack_into(headers, offset, msg_type, len(payload))
+            buffers.append(header_view[offset:offset + size])
+            buffers.append(payload)
+            offset += size
+        return buffers
+
+    def _ack_view(self, expected: int) -> memoryview:
+        """View of the reused ACK buffer sized for one flush."""
+        if expected > len(self._ack_buf):
+            self._ack_buf = bytearray(expected)
+        return memoryview(self._ack_buf)[:expected]
+
+    def _write_buffers(self, buffers: List[Any]) -> None:
+        """
+        Write buffers to the socket in as few system calls as possible.
+        
+        Buffers are grouped into writes of at most _MAX_WRITE_BYTES and
+        sent with scatter-gather sendmsg() where the platform has it,
+        avoiding a copy into one joined buffer.
+        """
+        sock = self._socket
+        sendmsg = getattr(sock, "sendmsg", None)
+
+        start = 0
+        while start < len(buffers):
+            end = start
+            size = 0
+            while (
+                end < len(buffers)
+                and end - start < _MAX_WRITE_BUFFERS
+                and (end == start or size + len(buffers[end]) <= _MAX_WRITE_BYTES)
+            ):
+                size += len(buffers[end])
+                end += 1
+            group = buffers[start:end]
+            start = end
+
+            if sendmsg is None:
+                sock.sendall(b"".join(group))
+                continue
+
+            sent = sendmsg(group)
+            if sent < size:
+                # Short write: send what the kernel did not take
+                sock.sendall(memoryview(b"".join(group))[sent:])
 
     @property
     def is_connected(self) -> bool:
         """Whether the transport is currently connected to the daemon."""
         return self._connected
+
+
+class AsyncOculoTransport(OculoTransport):
+    """
+    Transport that flushes on an asyncio event loop instead of a thread.
+    
+    start() must be called from a coroutine running in the loop; the
+    transport then connects, writes and reads ACKs with the loop's
+    non-blocking socket methods, so no flush thread is created. Outside
+    a running loop, start() falls back to the background thread.
+    
+    Messages are encoded on the loop when they are flushed, and a flush
+    cannot start until the code queueing messages yields to the loop, so
+    a longer burst is capped at twice max_buffer_size. send() may still
+    be called from other threads. Close the transport with
+    ``await aclose()`` from the loop so the last messages are sent.
+    
+    Takes the same arguments as OculoTransport.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Start flushing on the running event loop, or on a thread without one."""
+        if self._running:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            super().start()
+            return
+
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._running = True
+        # Connect on the first flush rather than blocking the loop here
+        logger.info("Oculo transport started on event loop (target: %s:%d)", self.host, self.port)
+
+    async def aclose(self) -> None:
+        """Stop the transport from its event loop, flushing remaining data."""
+        if self._loop is None:
+            self.stop()
+            return
+
+        self._flush_trackers()
+        self._running = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = self._flush_task
+        if task is not None:
+            # Not running any more, so it won't schedule another flush
+            await asyncio.shield(task)
+        await self._async_flush()
+
+        self._disconnect()
+        self._loop = None
+        logger.info(
+            "Oculo transport stopped (sent: %d, dropped: %d, errors: %d)",
+            self.messages_sent, self.messages_dropped, self.errors,
+        )
+
+    def stop(self) -> None:
+        """
+        Stop the transport without awaiting, flushing remaining data.
+        
+        Meant for after the event loop has finished; a flush still in
+        progress on the loop is cancelled and its messages are lost.
+        """
+        if self._loop is not None:
+            self._running = False
+            self._leave_loop()
+        super().stop()
+
+    def send(self, msg_type: int, data: Dict[str, Any]) -> None:
+        """
+        Queue a message for async delivery to the daemon.
+        
+        Arranges a flush on the event loop; see OculoTransport.send().
+        Once the loop has closed, messages stay queued until stop().
+        """
+        super().send(msg_type, data)
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            if loop.is_closed():
+                raise RuntimeError("Event loop is closed")
+            if threading.get_ident() == self._loop_thread:
+                self._schedule_flush()
+            else:
+                loop.call_soon_threadsafe(self._schedule_flush)
+        except RuntimeError:
+            # Closed, possibly by another thread after the check above
+            self._leave_loop()
+
+    def _leave_loop(self) -> None:
+        """Stop using the event loop; later flushes happen in stop()."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = self._flush_task
+        if task is not None and not task.done():
+            try:
+                task.cancel()
+            except RuntimeError:
+                pass  # its loop is already closed
+            # The cancelled write may have left half a frame on the socket
+            self._disconnect()
+        self._flush_task = None
+        self._loop = None
+        if self._socket is not None:
+            self._socket.settimeout(self.connect_timeout)
+
+    def _schedule_flush(self) -> None:
+        """
+        Arrange the next flush; runs on the event loop.
+        
+        Flushes flush_interval after the first message is queued, or at
+        once when max_buffer_size messages are waiting. A flush already
+        in progress schedules the next one when it finishes.
+        """
+        if not self._running or self._flush_task is not None or not self._buffer:
+            return
+        if len(self._buffer) >= self.max_buffer_size:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        self._flush_task = self._loop.create_task(self._async_flush())
+        self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: "asyncio.Task[None]") -> None:
+        self._flush_task = None
+        # Pick up anything queued, or requeued, while flushing
+        self._schedule_flush()
+
+    async def _async_flush(self) -> None:
+        """Send all buffered messages to the daemon without blocking the loop."""
+        messages = self._take_messages()
+        if not messages:
+            return
+
+        if not self._connected:
+            if not await self._async_connect():
+                self._requeue(messages)
+                return
+
+        frames, count = self._encode_frames(messages)
+        if not frames:
+            return
+
+        try:
+            await self._async_send_frames(frames)
+            self.messages_sent += count
+        except Exception as e:
+            self.errors += 1
+            logger.debug("Failed to send messages: %s", e)
+            # Reconnect on next flush
+            self._disconnect()
+
+    async def _async_connect(self) -> bool:
+        """Establish a non-blocking connection to the daemon."""
+        try:
+            sock = await self._async_open_socket()
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning("Cannot connect to Oculo daemon: %s", e)
+            return False
+        with self._lock:
+            self._socket = sock
+            self._connected = True
+        return True
+
+    async def _async_open_socket(self) -> socket.socket:
+        """Non-blocking counterpart of OculoTransport._open_socket()."""
+        loop = self._loop
+        if self._prefers_unix_socket():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.setblocking(False)
+                await asyncio.wait_for(loop.sock_connect(sock, self.socket_path), self.connect_timeout)
+                self._tune_socket(sock, tcp=False)
+            except (OSError, asyncio.TimeoutError) as e:
+                sock.close()
+                logger.debug("Cannot connect to %s, falling back to TCP: %s", self.socket_path, e)
+            else:
+                logger.debug("Connected to Oculo daemon at %s", self.socket_path)
+                return sock
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (self.host, self.port)), self.connect_timeout)
+            self._tune_socket(sock, tcp=True)
+        except BaseException:
+            sock.close()
+            raise
+        logger.debug("Connected to Oculo daemon at %s:%d", self.host, self.port)
+        return sock
+
+    async def _async_send_frames(self, frames: List[Tuple[int, bytes]]) -> None:
+        """Non-blocking counterpart of OculoTransport._send_frames()."""
+        loop = self._loop
+        sock = self._socket
+        if not sock:
+            raise ConnectionError("Not connected to daemon")
+
+        # The loop writes whatever the kernel takes and waits for the rest,
+        # so one joined buffer costs a copy but no extra system calls
+        await loop.sock_sendall(sock, b"".join(self._pack_frames(frames)))
+
+        view = self._ack_view(len(frames))
+        received = 0
+        while received < len(view):
+            n = await loop.sock_recv_into(sock, view[received:])
+            if n == 0:
+                raise ConnectionError("Daemon closed the connection")
+            received += n
+
+        if any(view):
+            raise RuntimeError(f"Daemon returned error ACK: {view.tobytes()!r}")
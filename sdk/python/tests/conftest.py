@@ -0,0 +1,79 @@
+"""Shared fixtures for the SDK tests."""
+
+import json
+import socket
+import struct
+import threading
+
+import pytest
+
+
+class FakeDaemon:
+    """TCP listener that decodes wire messages and ACKs each with 0x00."""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(8)
+        self.port = self.server.getsockname()[1]
+        self.messages = []
+        self._received = threading.Condition()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def wait_for(self, count, timeout=5.0):
+        """Block until at least count messages have arrived."""
+        with self._received:
+            self._received.wait_for(lambda: len(self.messages) >= count, timeout)
+        return self.messages
+
+    def items(self, field):
+        """All items of one kind, from plain messages and batches alike."""
+        plain = {"traces": 0x01, "spans": 0x02, "memory_events": 0x03}
+        found = []
+        for msg_type, payload in self.messages:
+            if msg_type == 0x04:
+                found.extend(payload.get(field, []))
+            elif plain.get(field) == msg_type:
+                found.append(payload)
+        return found
+
+    def close(self):
+        self.server.close()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                header = self._read(conn, 5)
+                if header is None:
+                    return
+                msg_type, length = struct.unpack(">BI", header)
+                payload = json.loads(self._read(conn, length))
+                with self._received:
+                    self.messages.append((msg_type, payload))
+                    self._received.notify_all()
+                conn.sendall(b"\x00")
+
+    @staticmethod
+    def _read(conn, n):
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+@pytest.fixture
+def daemon():
+    d = FakeDaemon()
+    yield d
+    d.close()
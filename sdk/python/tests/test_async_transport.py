@@ -0,0 +1,143 @@
+"""Tests for AsyncOculoTransport against a fake daemon."""
+
+import asyncio
+import threading
+
+from oculo import AsyncOculoTransport, MemoryTracker, OculoTracer
+from oculo.transport import MessageType
+
+
+def _transport(daemon, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    return AsyncOculoTransport(port=daemon.port, **kwargs)
+
+
+def test_flushes_on_event_loop_without_thread(daemon):
+    """Queued messages are sent by the loop, not a flush thread."""
+    async def main():
+        transport = _transport(daemon)
+        transport.start()
+        assert transport._flush_thread is None
+        transport.send(MessageType.TRACE, {"trace_id": "t1"})
+        await asyncio.sleep(0.1)
+        sent = transport.messages_sent
+        await transport.aclose()
+        return sent
+
+    assert asyncio.run(main()) == 1
+    assert daemon.items("traces") == [{"trace_id": "t1"}]
+
+
+def test_high_water_mark_flushes_before_interval(daemon):
+    """Reaching max_buffer_size flushes without waiting for the timer."""
+    async def main():
+        transport = _transport(daemon, flush_interval=60, max_buffer_size=5)
+        transport.start()
+        for i in range(5):
+            transport.send(MessageType.MEMORY_EVENT, {"i": i})
+        for _ in range(100):
+            if transport.messages_sent == 5:
+                break
+            await asyncio.sleep(0.01)
+        sent = transport.messages_sent
+        await transport.aclose()
+        return sent
+
+    assert asyncio.run(main()) == 5
+
+
+def test_send_from_other_thread(daemon):
+    """send() from a worker thread schedules the flush on the loop."""
+    async def main():
+        transport = _transport(daemon)
+        transport.start()
+        worker = threading.Thread(target=transport.send, args=(MessageType.TRACE, {"trace_id": "t1"}))
+        worker.start()
+        worker.join()
+        await asyncio.sleep(0.1)
+        sent = transport.messages_sent
+        await transport.aclose()
+        return sent
+
+    assert asyncio.run(main()) == 1
+
+
+def test_aclose_sends_remaining_messages(daemon):
+    """Messages queued just before aclose() are still delivered."""
+    async def main():
+        transport = _transport(daemon, flush_interval=60)
+        transport.start()
+        transport.send(MessageType.TRACE, {"trace_id": "t1"})
+        await transport.aclose()
+        return transport.messages_sent
+
+    assert asyncio.run(main()) == 1
+    assert daemon.items("traces") == [{"trace_id": "t1"}]
+
+
+def test_send_after_loop_closed_does_not_raise(daemon):
+    """Tracing after the loop has closed queues messages for close()."""
+    async def main():
+        tracer = OculoTracer(agent_name="agent", transport=_transport(daemon))
+        with tracer.trace(trace_id="t1"):
+            pass
+        await asyncio.sleep(0.1)
+        return tracer
+
+    tracer = asyncio.run(main())
+    with tracer.trace(trace_id="t2"):
+        pass
+    tracer.close()
+
+    assert [t["trace_id"] for t in daemon.items("traces")] == ["t1", "t1", "t2", "t2"]
+    assert tracer.transport.errors == 0
+
+
+def test_send_from_thread_after_loop_closed(daemon):
+    """The cross-thread path also survives a closed loop."""
+    async def main():
+        transport = _transport(daemon)
+        transport.start()
+        return transport
+
+    transport = asyncio.run(main())
+    errors = []
+
+    def send():
+        try:
+            transport.send(MessageType.TRACE, {"trace_id": "t1"})
+        except Exception as e:  # pragma: no cover - failure path
+            errors.append(e)
+
+    worker = threading.Thread(target=send)
+    worker.start()
+    worker.join()
+    transport.stop()
+
+    assert errors == []
+    assert daemon.items("traces") == [{"trace_id": "t1"}]
+
+
+def test_falls_back_to_thread_without_loop(daemon):
+    """Started outside a running loop, the transport uses its flush thread."""
+    transport = _transport(daemon)
+    transport.start()
+    assert transport._flush_thread is not None
+    transport.send(MessageType.TRACE, {"trace_id": "t1"})
+    transport.stop()
+
+    assert daemon.items("traces") == [{"trace_id": "t1"}]
+
+
+def test_aclose_flushes_memory_trackers(daemon):
+    """Events still buffered in a tracker are sent by aclose()."""
+    async def main():
+        transport = _transport(daemon)
+        transport.start()
+        tracker = MemoryTracker(transport)
+        tracker["goal"] = "research"
+        await transport.aclose()
+        return tracker
+
+    asyncio.run(main())
+    assert [e["key"] for e in daemon.items("memory_events")] == ["goal"]
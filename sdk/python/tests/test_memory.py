@@ -0,0 +1,82 @@
+"""Tests for MemoryTracker event buffering."""
+
+import gc
+
+from oculo import MemoryTracker, OculoTracer, _json
+from oculo.memory import compute_memory_diff
+
+
+def test_collected_tracker_sends_pending_events(daemon):
+    """Events buffered by a tracker that is never flushed still arrive."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+
+    def update_state():
+        tracker = tracer.memory_tracker()
+        tracker["goal"] = "research"
+        tracker["step"] = 1
+
+    update_state()
+    gc.collect()
+    tracer.close()
+
+    assert [e["key"] for e in daemon.items("memory_events")] == ["goal", "step"]
+
+
+def test_directly_built_tracker_is_flushed_on_close(daemon):
+    """A tracker built on the transport directly is flushed when it stops."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+    tracker = MemoryTracker(tracer.transport, initial_state={"goal": "research"})
+    tracker["goal"] = "publish"
+    tracker["step"] = 1
+    tracer.close()
+
+    assert [e["key"] for e in daemon.items("memory_events")] == ["goal", "step"]
+    assert tracer.transport.messages_sent == 1
+
+
+def test_flush_empties_the_buffer(daemon):
+    """Flushed events are not sent again when the tracker is collected."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+    tracker = tracer.memory_tracker()
+    tracker["goal"] = "research"
+    tracker.flush()
+    del tracker
+    gc.collect()
+    tracer.close()
+
+    assert [e["key"] for e in daemon.items("memory_events")] == ["goal"]
+
+
+def test_diff_reports_container_changes_equal_under_eq():
+    """Containers that compare equal but serialize differently are updates."""
+    for before, after in [({"x": 1}, {"x": True}), ([1], [1.0])]:
+        events = compute_memory_diff({"a": before}, {"a": after})
+        assert [(e["operation"], e["key"]) for e in events] == [("UPDATE", "a")]
+
+
+def test_diff_skips_unchanged_values():
+    """Equal scalars and equal containers produce no events."""
+    assert compute_memory_diff({"a": 1, "b": [1, 2]}, {"a": 1, "b": [1, 2]}) == []
+
+
+def test_non_finite_floats_serialize_like_the_encoder():
+    """inf and nan are written by the JSON encoder, not float repr."""
+    for value in (float("inf"), float("-inf"), float("nan")):
+        assert MemoryTracker._serialize(value) == _json.dumps(value)
+
+
+def test_signed_zero_is_a_change(daemon):
+    """Writing -0.0 over 0.0 is an update, since the serialized text differs."""
+    assert [e["operation"] for e in compute_memory_diff({"a": 0.0}, {"a": -0.0})] == ["UPDATE"]
+
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+    tracker = tracer.memory_tracker()
+    tracker["a"] = 0.0
+    tracker["a"] = -0.0
+    tracker["a"] = -0.0
+    tracer.close()
+
+    assert [(e["operation"], e["new_value"]) for e in daemon.items("memory_events")] == [
+        ("ADD", "0.0"),
+        ("UPDATE", "-0.0"),
+    ]
@@ -0,0 +1,92 @@
+"""Tests for SpanContext and its memory tracking."""
+
+import json
+
+from oculo import OculoTracer
+from oculo.span import _MEMORY_EVENT_FLUSH_THRESHOLD, MemoryTrackerBridge, _truncate_text
+
+
+def _span_events(daemon):
+    """(operation, key) pairs from the memory event columns received."""
+    return [
+        pair
+        for block in daemon.items("memory_event_columns")
+        for pair in zip(block["operations"], block["keys"])
+    ]
+
+
+def test_memory_tracker_bridge_keeps_old_constructor(daemon):
+    """The old bridge signature still records events on the span."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+    with tracer.trace() as trace:
+        with trace.span("step") as span:
+            memory = MemoryTrackerBridge(span_context=span, initial_state={"goal": "a"}, namespace="agent")
+            memory["goal"] = "b"
+            del memory["missing"]
+    tracer.close()
+
+    assert _span_events(daemon) == [("UPDATE", "goal"), ("DELETE", "missing")]
+
+
+def test_truncate_text_leaves_short_text():
+    """Text within the limit, or with no limit, is returned as is."""
+    assert _truncate_text("hello", 5) == ("hello", False)
+    assert _truncate_text("x" * 100, None) == ("x" * 100, False)
+    assert _truncate_text(None, 5) == (None, False)
+
+
+def test_truncate_text_cuts_on_character_boundary():
+    """A multibyte character straddling the limit is dropped whole."""
+    text = "ab" + "\u00e9" * 3 + "\u20ac"  # 2 + 6 + 3 bytes
+
+    for limit, expected in [(3, "ab"), (4, "ab\u00e9"), (9, "ab\u00e9\u00e9\u00e9"), (10, "ab\u00e9\u00e9\u00e9")]:
+        cut, was_cut = _truncate_text(text, limit)
+        assert (cut, was_cut) == (expected, True)
+        assert len(cut.encode("utf-8")) <= limit
+    assert _truncate_text(text, 11) == (text, False)
+
+
+def test_long_prompt_is_truncated_and_flagged(daemon):
+    """Over-long text is cut and the span's metadata says so."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port, max_text_bytes=8)
+    with tracer.trace() as trace:
+        with trace.span("long", metadata={"k": "v"}) as span:
+            span.set_prompt("\u20ac" * 5)
+            span.set_completion("short")
+        with trace.span("short") as span:
+            span.set_prompt("fits")
+    tracer.close()
+
+    long_span, short_span = daemon.items("spans")
+    assert long_span["prompt"] == "\u20ac\u20ac"
+    assert long_span["completion"] == "short"
+    assert json.loads(long_span["metadata"]) == {"k": "v", "truncated": True}
+    assert short_span["prompt"] == "fits"
+    assert short_span["metadata"] is None
+
+
+def test_long_span_flushes_memory_events_early(daemon):
+    """Events past the threshold go out with a provisional span record."""
+    total = _MEMORY_EVENT_FLUSH_THRESHOLD + 5
+    tracer = OculoTracer(agent_name="agent", port=daemon.port)
+    with tracer.trace() as trace:
+        with trace.span("busy") as span:
+            for i in range(total):
+                span.record_memory_event("ADD", f"k{i}", new_value=str(i))
+
+            # Sent while the span is still open, after the trace start
+            # record; the block is over the merge cap, so in its own frame
+            daemon.wait_for(2)
+            assert [s["span_id"] for s in daemon.items("spans")] == [span.span_id]
+            (block,) = daemon.items("memory_event_columns")
+            assert block["first_seq"] == 0
+            assert len(block["keys"]) == _MEMORY_EVENT_FLUSH_THRESHOLD
+    tracer.close()
+
+    spans = daemon.items("spans")
+    assert [s["span_id"] for s in spans] == [span.span_id] * 2
+    assert spans[-1]["status"] == "ok"
+
+    blocks = daemon.items("memory_event_columns")
+    assert [b["first_seq"] for b in blocks] == [0, _MEMORY_EVENT_FLUSH_THRESHOLD]
+    assert [k for b in blocks for k in b["keys"]] == [f"k{i}" for i in range(total)]
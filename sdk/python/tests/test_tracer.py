@@ -0,0 +1,51 @@
+"""Tests for OculoTracer trace and span lifecycle."""
+
+import random
+
+from oculo import OculoTracer
+from oculo.transport import MessageType
+
+
+def test_trace_metadata_is_private_to_the_trace():
+    """Changing one trace's metadata leaves the tracer and later traces alone."""
+    tracer = OculoTracer(agent_name="agent", auto_start=False, metadata={"env": "prod"})
+    with tracer.trace(trace_id="t1") as trace:
+        trace.metadata["run"] = "1"
+    with tracer.trace(trace_id="t2") as trace:
+        assert trace.metadata == {"env": "prod"}
+
+    assert tracer.metadata == {"env": "prod"}
+    starts = [data for msg_type, data in tracer.transport._buffer
+              if msg_type == MessageType.TRACE and "metadata" in data]
+    assert starts[1]["metadata"] == {"env": "prod"}
+
+
+def test_unsampled_trace_sends_nothing(daemon):
+    """A trace dropped by sampling sends no trace, span or memory event."""
+    tracer = OculoTracer(agent_name="agent", port=daemon.port, sample_rate=0.0)
+    with tracer.trace() as trace:
+        assert not trace.sampled
+        with trace.span("step") as span:
+            span.set_prompt("prompt")
+            memory = span.memory_tracker()
+            memory["goal"] = "research"
+            span.attach_memory(tracer.memory_tracker())
+    tracer.close()
+
+    assert daemon.messages == []
+    assert tracer.transport.messages_sent == 0
+
+
+def test_sampling_keeps_whole_traces(daemon, monkeypatch):
+    """Each trace is kept or dropped as a whole, by sample_rate."""
+    draws = iter([0.2, 0.7])
+    monkeypatch.setattr(random, "random", lambda: next(draws))
+    tracer = OculoTracer(agent_name="agent", port=daemon.port, sample_rate=0.5)
+    for trace_id in ("kept", "dropped"):
+        with tracer.trace(trace_id=trace_id) as trace:
+            with trace.span("step"):
+                pass
+    tracer.close()
+
+    assert {t["trace_id"] for t in daemon.items("traces")} == {"kept"}
+    assert len(daemon.items("spans")) == 1
@@ -0,0 +1,187 @@
+"""Tests for the transport's message coalescing, batch compaction and socket choice."""
+
+from oculo import transport as transport_module
+from oculo.transport import (
+    _MAX_BATCH_BYTES,
+    _MAX_BATCH_ITEMS,
+    MessageType,
+    OculoTransport,
+    _coalesce,
+    _compact_spans,
+)
+
+
+def _span(span_id, start_time, trace_id="trace-1"):
+    return {"span_id": span_id, "trace_id": trace_id, "start_time": start_time}
+
+
+def test_single_message_is_sent_unchanged():
+    """A lone item keeps its own message type."""
+    trace = {"trace_id": "trace-1"}
+    assert _coalesce([(MessageType.TRACE, trace)]) == [(MessageType.TRACE, trace, [(MessageType.TRACE, trace)])]
+
+
+def test_trace_is_merged_with_following_batch():
+    """A trace start queued before a span batch travels in the same batch."""
+    trace = {"trace_id": "trace-1"}
+    batch = {"spans": [_span("s1", 100)], "memory_event_columns": [{"span_id": "s1"}]}
+
+    result = _coalesce([(MessageType.TRACE, trace), (MessageType.BATCH, batch)])
+
+    assert len(result) == 1
+    msg_type, payload, group = result[0]
+    assert msg_type == MessageType.BATCH
+    assert len(group) == 2
+    assert payload["traces"] == [trace]
+    assert payload["spans"] == [_span("s1", 100)]
+    assert payload["memory_event_columns"] == [{"span_id": "s1"}]
+
+
+def test_merge_keeps_order_within_each_kind():
+    """Repeated records of one span stay in queued order across batches."""
+    provisional = {"spans": [{"span_id": "s1", "status": "running"}]}
+    final = {"span_id": "s1", "status": "ok"}
+
+    (_, payload, group), = _coalesce([
+        (MessageType.BATCH, provisional),
+        (MessageType.SPAN, final),
+    ])
+
+    assert len(group) == 2
+    assert [s["status"] for s in payload["spans"]] == ["running", "ok"]
+
+
+def test_merge_does_not_modify_queued_batches():
+    """Merging and compaction leave the caller's lists and span dicts alone."""
+    first = {"traces": [{"trace_id": "a"}], "spans": [_span("s1", 150)]}
+    second = {"traces": [{"trace_id": "b"}], "spans": [_span("s2", 100)]}
+
+    (_, payload, _), = _coalesce([(MessageType.BATCH, first), (MessageType.BATCH, second)])
+
+    assert payload["base_time"] == 100
+    assert first == {"traces": [{"trace_id": "a"}], "spans": [_span("s1", 150)]}
+    assert second == {"traces": [{"trace_id": "b"}], "spans": [_span("s2", 100)]}
+
+
+def test_batches_are_capped():
+    """No merged batch carries more than _MAX_BATCH_ITEMS items."""
+    messages = [(MessageType.MEMORY_EVENT, {"i": i}) for i in range(_MAX_BATCH_ITEMS * 2 + 1)]
+
+    result = _coalesce(messages)
+
+    assert [len(group) for _, _, group in result] == [_MAX_BATCH_ITEMS, _MAX_BATCH_ITEMS, 1]
+    assert [e["i"] for _, payload, _ in result[:2] for e in payload["memory_events"]] == list(range(_MAX_BATCH_ITEMS * 2))
+
+
+def test_large_batch_is_sent_alone():
+    """A queued batch over the cap is not merged with its neighbours."""
+    big = {"memory_events": [{"i": i} for i in range(_MAX_BATCH_ITEMS + 1)]}
+    trace = {"trace_id": "trace-1"}
+
+    result = _coalesce([(MessageType.TRACE, trace), (MessageType.BATCH, big), (MessageType.TRACE, trace)])
+
+    assert [(msg_type, payload) for msg_type, payload, _ in result] == [
+        (MessageType.TRACE, trace),
+        (MessageType.BATCH, big),
+        (MessageType.TRACE, trace),
+    ]
+
+
+def test_column_events_count_toward_the_cap():
+    """A span batch is as large as the memory events in its column block."""
+    def span_batch(i):
+        columns = {"span_id": f"s{i}", "timestamps": list(range(_MAX_BATCH_ITEMS))}
+        return (MessageType.BATCH, {"spans": [_span(f"s{i}", i)], "memory_event_columns": [columns]})
+
+    result = _coalesce([span_batch(i) for i in range(3)])
+
+    assert [len(group) for _, _, group in result] == [1, 1, 1]
+
+
+def test_oversized_merged_batch_is_sent_unmerged(daemon):
+    """A merged batch over _MAX_BATCH_BYTES goes out as its queued messages."""
+    transport = OculoTransport(port=daemon.port)
+    value = "x" * (_MAX_BATCH_BYTES // 8)
+    for i in range(10):
+        transport.send(MessageType.MEMORY_EVENT, {"key": f"k{i}", "new_value": value})
+    transport.stop()
+
+    assert transport.messages_sent == 10
+    assert [msg_type for msg_type, _ in daemon.messages] == [MessageType.MEMORY_EVENT] * 10
+    assert [e["key"] for e in daemon.items("memory_events")] == [f"k{i}" for i in range(10)]
+
+
+def test_small_merged_batch_is_one_frame():
+    """Merged batches under the byte limit are sent as a single frame."""
+    transport = OculoTransport()
+    messages = [(MessageType.MEMORY_EVENT, {"key": f"k{i}"}) for i in range(10)]
+
+    frames, count = transport._encode_frames(messages)
+
+    assert count == 10
+    assert [msg_type for msg_type, _ in frames] == [MessageType.BATCH]
+
+
+def test_unknown_message_type_ends_the_run():
+    """Messages with no batch field are sent on their own, in order."""
+    result = _coalesce([
+        (MessageType.TRACE, {"trace_id": "a"}),
+        (0x7F, {"x": 1}),
+        (MessageType.TRACE, {"trace_id": "b"}),
+    ])
+
+    assert [msg_type for msg_type, _, _ in result] == [MessageType.TRACE, 0x7F, MessageType.TRACE]
+
+
+def test_compact_spans_factors_shared_values():
+    """Start times become offsets and a shared trace ID moves to the batch."""
+    batch = {"spans": [_span("s1", 150), _span("s2", 100)]}
+
+    _compact_spans(batch)
+
+    assert batch["base_time"] == 100
+    assert batch["trace_id"] == "trace-1"
+    assert batch["spans"] == [
+        {"span_id": "s1", "start_time": 50},
+        {"span_id": "s2", "start_time": 0},
+    ]
+
+
+def test_compact_spans_keeps_mixed_trace_ids():
+    """Spans from different traces keep their own trace IDs."""
+    batch = {"spans": [_span("s1", 100, "trace-1"), _span("s2", 200, "trace-2")]}
+
+    _compact_spans(batch)
+
+    assert "trace_id" not in batch
+    assert [s["trace_id"] for s in batch["spans"]] == ["trace-1", "trace-2"]
+
+
+def test_compact_spans_skips_spans_without_start_time():
+    """Spans that weren't built by SpanContext are left as they are."""
+    batch = {"spans": [{"span_id": "s1"}, _span("s2", 100)]}
+
+    _compact_spans(batch)
+
+    assert "base_time" not in batch
+    assert batch["spans"][1]["start_time"] == 100
+
+
+def test_default_socket_only_for_default_address(tmp_path, monkeypatch):
+    """The default Unix socket is skipped when another port is requested."""
+    path = tmp_path / "oculo.sock"
+    path.touch()
+    monkeypatch.setattr(transport_module, "DEFAULT_SOCKET_PATH", str(path))
+
+    assert OculoTransport(socket_path=str(path))._prefers_unix_socket()
+    assert not OculoTransport(port=12345, socket_path=str(path))._prefers_unix_socket()
+    assert not OculoTransport(host="10.0.0.2", socket_path=str(path))._prefers_unix_socket()
+
+
+def test_explicit_socket_path_is_always_preferred(tmp_path):
+    """A socket path other than the default is used for any address."""
+    path = tmp_path / "custom.sock"
+    path.touch()
+
+    assert OculoTransport(port=12345, socket_path=str(path))._prefers_unix_socket()
+    assert not OculoTransport(socket_path=None)._prefers_unix_socket()